@@ -1,3 +1,10 @@
+import time
+
+from batch_eval import leaf_scores
+from parallel import record_result, RootSplitter, search_alpha_beta
+from trace_sink import MemorySink, NullSink
+
+
 def toggle_player(player):
     if player == 'X':
         return 'O'
@@ -5,39 +12,231 @@ def toggle_player(player):
         return 'X'
 
 
+TIME_CHECK_INTERVAL = 256
+KILLER_SLOTS = 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class MoveOrdering:
+    def __init__(self):
+        self.killers = {}
+        self.history = {}
+
+    def order(self, moves, player, ply, table_move):
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(move):
+            if move == table_move:
+                return 2, 0
+            if move in killers:
+                return 1, 0
+            return 0, history.get((player, move), 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, move, player, ply, remaining):
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[KILLER_SLOTS:]
+        self.history[(player, move)] = self.history.get((player, move), 0) + remaining * remaining
+
+
 class AlphaBetaStrategy:
-    def __init__(self, player, depth):
+    def __init__(self, player, depth, table=None, time_limit=None, workers=None, sink=None, batch_leaves=False,
+                 stats=None):
         self.player = player
         self.depth = depth
+        self.workers = workers
+        self.splitter = None
+        self.sink = sink
+        self.tracing = not isinstance(sink, NullSink)
+        self.batch_leaves = batch_leaves
+        self.stats = stats
+        self.max_depth = depth
+        self.table = table
+        self.time_limit = time_limit
+        self.ordering = time_limit is not None
+        self.deadline = None
+        self.nodes = 0
+        self.move_order = MoveOrdering()
+        self.root_scores = {}
+        self.best_move = None
+        self.value = None
         self.trace = []
 
     def move(self, board):
-        next_best_move = board
+        if self.stats is not None:
+            self.stats.start()
+        if self.table is not None:
+            self.table.new_search(board.values)
+        if self.time_limit is not None:
+            result = self.iterative_deepening(board)
+        else:
+            if self.workers:
+                best_move = self.parallel_root(board, board.valid_moves(self.player))
+            else:
+                best_move = self.search_root(board, board.valid_moves(self.player))
+            result = self.trace, self.next_state(board, best_move)
+        if self.stats is not None:
+            self.stats.finish()
+        return result
+
+    def close(self):
+        if self.splitter is not None:
+            self.splitter.close()
+            self.splitter = None
+
+    def start_trace(self, row):
+        self.trace = self.sink if self.sink is not None else []
+        self.tracing = not isinstance(self.sink, NullSink)
+        self.trace.append(row)
+
+    def next_state(self, board, move):
+        if move is None:
+            return board
+        return board.sneak(move, self.player)
+
+    def iterative_deepening(self, board):
+        self.deadline = None
+        self.move_order = MoveOrdering()
+        search_board = board.clone()
+        moves = search_board.valid_moves(self.player)
+        best_move = None
+        # every depth past the last free cell scores the filled board the same way as the fixed-depth search
+        max_depth = min(self.max_depth, len(moves) + 1)
+        deadline = time.time() + self.time_limit
+        # each iteration traces into memory, and only the last completed one reaches the sink
+        sink = self.sink
+        rows = []
+        try:
+            for depth in range(1, max_depth + 1):
+                self.depth = depth
+                if not isinstance(sink, NullSink):
+                    self.sink = MemorySink()
+                try:
+                    best_move = self.search_root(search_board, moves)
+                except SearchTimeout:
+                    if self.best_move is not None:
+                        best_move = self.best_move
+                    break
+                rows = self.trace
+                scores = self.root_scores
+                moves = sorted(moves, key=lambda move: scores[move], reverse=True)
+                self.deadline = deadline
+                if time.time() > deadline:
+                    break
+        finally:
+            self.sink = sink
+            self.depth = self.max_depth
+            self.deadline = None
+        self.trace = sink if sink is not None else []
+        self.trace.extend(rows)
+        return self.trace, self.next_state(board, best_move)
+
+    def search_root(self, board, moves):
         alpha = float('-Infinity')
         beta = float('Infinity')
         value = alpha
-        self.trace = [('root', 0, value, alpha, beta)]
-        moves = board.valid_moves(self.player)
+        self.best_move = None
+        self.root_scores = {}
+        self.start_trace(('root', 0, value, alpha, beta))
         for move in moves:
+            started, nodes = time.time(), self.nodes
             next_level_evaluation = self.traverse_next_level(board, move, 1, self.player, alpha,
                                                              beta)
+            if self.stats is not None:
+                self.stats.root_move(board.location_name(move), self.depth, next_level_evaluation,
+                                     time.time() - started, self.nodes - nodes)
+            self.root_scores[move] = next_level_evaluation
             if next_level_evaluation > value:
                 value = next_level_evaluation
-                next_best_move = board.sneak(move, self.player)
+                self.best_move = move
                 alpha = value
 
             self.trace.append(('root', 0, value, alpha, beta))
-        return self.trace, next_best_move
+        self.value = value
+        return self.best_move
+
+    def parallel_root(self, board, moves):
+        alpha = float('-Infinity')
+        beta = float('Infinity')
+        value = alpha
+        self.best_move = None
+        self.root_scores = {}
+        self.start_trace(('root', 0, value, alpha, beta))
+        if self.splitter is None:
+            self.splitter = RootSplitter(self.workers)
+        bounds = None
+        if self.tracing:
+            # the serial search gives each root move the best exact value of the moves before it as alpha,
+            # so searching every subtree with those bounds reproduces its trace in any worker order
+            bounds = []
+            best = alpha
+            exact = self.splitter.map(search_alpha_beta, self, board, moves, [alpha] * len(moves), False)
+            for move, result in zip(moves, exact):
+                bounds.append(best)
+                best = max(best, record_result(self, board, move, result, root=False)[0])
+        results = self.splitter.map(search_alpha_beta, self, board, moves, bounds)
+        for move, result in zip(moves, results):
+            next_level_evaluation, subtree_trace = record_result(self, board, move, result)
+            self.trace.extend(subtree_trace)
+            self.root_scores[move] = next_level_evaluation
+            if next_level_evaluation > value:
+                value = next_level_evaluation
+                self.best_move = move
+                alpha = value
+
+            self.trace.append(('root', 0, value, alpha, beta))
+        self.value = value
+        return self.best_move
+
+    def check_deadline(self):
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.time() > self.deadline:
+            raise SearchTimeout()
+
+    def leaf(self, board, move, current_depth, evaluation, alpha, beta):
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(current_depth)
+        if self.tracing:
+            self.trace.append((board.location_name(move), current_depth, evaluation, alpha, beta))
+        return evaluation
 
     def traverse_next_level(self, board, move, current_depth, player, alpha, beta):
-        state = board.sneak(move, player)
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(current_depth)
+        if self.deadline is not None:
+            self.check_deadline()
+        undo = board.apply_move(move, player)
         if current_depth == self.depth:
-            next_state_evaluation = state.evaluate(self.player)
-            self.trace.append((state.location_name(move), current_depth, next_state_evaluation, alpha, beta))
+            next_state_evaluation = board.evaluate(self.player)
+            if self.tracing:
+                self.trace.append((board.location_name(move), current_depth, next_state_evaluation, alpha, beta))
+            board.undo_move(undo)
             return next_state_evaluation
         else:
-            if state.is_over():
-                return state.evaluate(toggle_player(player))
+            if board.is_over():
+                value = board.evaluate(toggle_player(player))
+                board.undo_move(undo)
+                return value
+
+            table_move = None
+            if self.table is not None:
+                key = board.zobrist_key(toggle_player(player))
+                cached = self.table.lookup(key, self.depth - current_depth, alpha, beta)
+                if cached is not None:
+                    board.undo_move(undo)
+                    return cached
+                entry = self.table.probe(key)
+                if entry is not None:
+                    table_move = entry[4]
+                window = (alpha, beta)
 
             should_minimize = current_depth % 2 == 1
             if should_minimize:
@@ -45,22 +244,50 @@ class AlphaBetaStrategy:
             else:
                 value = float('-Infinity')
 
-            next_moves = state.valid_moves(player)
+            next_moves = board.valid_moves(player)
+            if self.ordering:
+                next_moves = self.move_order.order(next_moves, toggle_player(player), current_depth + 1, table_move)
+            best_move = None
+            leaves = None
+            if self.batch_leaves and current_depth + 1 == self.depth:
+                leaves = leaf_scores(board, next_moves, toggle_player(player), self.player)
 
-            for next_move in next_moves:
-                self.trace.append((board.location_name(move), current_depth, value, alpha, beta))
-                next_state_evaluation = self.traverse_next_level(board.sneak(move, player), next_move,
-                                                                 current_depth + 1,
-                                                                 toggle_player(player), alpha, beta)
+            for n, next_move in enumerate(next_moves):
+                if self.tracing:
+                    self.trace.append((board.location_name(move), current_depth, value, alpha, beta))
+                if leaves is not None:
+                    next_state_evaluation = self.leaf(board, next_move, current_depth + 1, leaves[n], alpha, beta)
+                else:
+                    next_state_evaluation = self.traverse_next_level(board, next_move,
+                                                                     current_depth + 1,
+                                                                     toggle_player(player), alpha, beta)
                 if should_minimize:
+                    if next_state_evaluation < value:
+                        best_move = next_move
                     value = min(value, next_state_evaluation)
                     if value <= alpha:
+                        if self.stats is not None:
+                            self.stats.cutoff(current_depth)
+                        if self.ordering:
+                            self.move_order.record_cutoff(next_move, toggle_player(player), current_depth + 1,
+                                                          self.depth - current_depth)
                         break
                     beta = min(value, beta)
                 else:
+                    if next_state_evaluation > value:
+                        best_move = next_move
                     value = max(value, next_state_evaluation)
                     if next_state_evaluation >= beta:
+                        if self.stats is not None:
+                            self.stats.cutoff(current_depth)
+                        if self.ordering:
+                            self.move_order.record_cutoff(next_move, toggle_player(player), current_depth + 1,
+                                                          self.depth - current_depth)
                         break
                     alpha = max(alpha, value)
-            self.trace.append((board.location_name(move), current_depth, value, alpha, beta))
+            if self.tracing:
+                self.trace.append((board.location_name(move), current_depth, value, alpha, beta))
+            if self.table is not None:
+                self.table.store(key, self.depth - current_depth, window[0], window[1], value, best_move)
+        board.undo_move(undo)
         return value
@@ -0,0 +1,64 @@
+from board import toggle_player
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+VALUE_ARRAYS = 64
+
+value_arrays = {}
+
+
+def available():
+    return numpy is not None
+
+
+def value_array(values, size):
+    array = value_arrays.get(values)
+    if array is None:
+        array = numpy.array(values, dtype=numpy.int64).reshape(size, size)
+        if len(value_arrays) >= VALUE_ARRAYS:
+            value_arrays.clear()
+        value_arrays[values] = array
+    return array
+
+
+def mask_array(mask, size):
+    digits = bin(mask)[2:].zfill(size * size)[::-1]
+    return (numpy.frombuffer(digits, dtype=numpy.uint8) - ord('0')).astype(numpy.int64).reshape(size, size)
+
+
+def neighbor_sum(grid):
+    total = numpy.zeros_like(grid)
+    total[1:, :] += grid[:-1, :]
+    total[:-1, :] += grid[1:, :]
+    total[:, 1:] += grid[:, :-1]
+    total[:, :-1] += grid[:, 1:]
+    return total
+
+
+def move_scores(board, player):
+    values = value_array(board.values, board.size)
+    own = mask_array(board.mask_of(player), board.size)
+    opponent = mask_array(board.mask_of(toggle_player(player)), board.size)
+    empty = 1 - own - opponent
+    raids = neighbor_sum(own) > 0
+    captured = neighbor_sum(opponent * values)
+    gains = empty * (values + raids * 2 * captured)
+    return (board.evaluate(player) + gains).ravel()
+
+
+def leaf_scores(board, moves, player, perspective):
+    if numpy is None:
+        scores = []
+        for move in moves:
+            undo = board.apply_move(move, player)
+            scores.append(board.evaluate(perspective))
+            board.undo_move(undo)
+        return scores
+    scores = move_scores(board, player)
+    if perspective != player:
+        scores = -scores
+    index_of = board.geometry.index_of
+    return scores[[index_of(move) for move in moves]].tolist()
@@ -0,0 +1,169 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from tournament import load_board, make_strategy, random_boards
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SAMPLES = os.path.join(HERE, 'sample')
+SCRIPT = os.path.join(HERE, 'hw1cs561s16.py')
+BASELINE = os.path.join(HERE, 'benchmark_baseline.json')
+OUTPUTS = ['next_state.txt', 'traverse_log.txt', 'trace_state.txt']
+REPEAT_BUDGET = 1.0
+MIN_SECONDS = 0.05
+
+
+def sample_player(file):
+    with open(file, 'r') as fin:
+        return fin.readlines()[1].strip()
+
+
+def load_boards(count, seed, stones):
+    boards = []
+    for file in sorted(glob.glob(os.path.join(SAMPLES, '*', 'input.txt'))):
+        name = 'sample/' + os.path.basename(os.path.dirname(file))
+        boards.append((name, sample_player(file), load_board(file)))
+    for n, board in enumerate(random_boards(seed, count, stones)):
+        boards.append(('random/%d' % n, 'X', board))
+    return boards
+
+
+def configurations(max_depth):
+    yield 'greedy', 1
+    for name in ('minimax', 'alphabeta', 'pvs'):
+        for depth in range(1, max_depth + 1):
+            yield name, depth
+
+
+def measure(job):
+    name, depth, board_name, player, board, repeat = job
+    timings = []
+    while len(timings) < repeat and sum(timings) < REPEAT_BUDGET:
+        strategy = make_strategy('%s:%d' % (name, depth), player)
+        start = time.time()
+        strategy.move(board)
+        timings.append(time.time() - start)
+    seconds = min(timings)
+    return {'key': '%s:%d:%s' % (name, depth, board_name), 'nodes': strategy.nodes, 'seconds': seconds,
+            'nodes_per_second': strategy.nodes / seconds if seconds else 0.0,
+            'peak_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def run_benchmarks(boards, max_depth, repeat):
+    jobs = [(name, depth, board_name, player, board, repeat)
+            for name, depth in configurations(max_depth) for board_name, player, board in boards]
+    pool = multiprocessing.Pool(1, maxtasksperchild=1)
+    try:
+        return pool.map(measure, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def same_output(produced, expected):
+    with open(produced, 'r') as a, open(expected, 'r') as b:
+        return a.read().replace('\r\n', '\n').rstrip('\n') == b.read().replace('\r\n', '\n').rstrip('\n')
+
+
+def check_samples():
+    failures = []
+    for sample in sorted(glob.glob(os.path.join(SAMPLES, '*'))):
+        work = tempfile.mkdtemp()
+        try:
+            subprocess.check_call([sys.executable, SCRIPT, '-i', os.path.join(sample, 'input.txt')], cwd=work)
+            for output in OUTPUTS:
+                expected = os.path.join(sample, output)
+                if os.path.exists(expected) and not same_output(os.path.join(work, output), expected):
+                    failures.append('%s/%s' % (os.path.basename(sample), output))
+        finally:
+            shutil.rmtree(work)
+    return failures
+
+
+def compare(results, baseline):
+    regressions = []
+    for result in results:
+        reference = baseline.get(result['key'])
+        if reference is not None and result['nodes'] != reference['nodes']:
+            regressions.append('%s searched %d nodes, baseline %d' % (result['key'], result['nodes'],
+                                                                        reference['nodes']))
+    return regressions
+
+
+def compare_timings(results, previous, tolerance):
+    slower = []
+    for result in results:
+        reference = previous.get(result['key'])
+        if reference is None:
+            continue
+        if result['seconds'] > reference['seconds'] * (1 + tolerance) and result['seconds'] > MIN_SECONDS:
+            slower.append('%s took %.4fs, previously %.4fs' % (result['key'], result['seconds'],
+                                                               reference['seconds']))
+        if result['peak_kb'] > reference['peak_kb'] * (1 + tolerance):
+            slower.append('%s peaked at %dKB, previously %dKB' % (result['key'], result['peak_kb'],
+                                                                  reference['peak_kb']))
+    return slower
+
+
+def report(results):
+    lines = ['%-28s %10s %10s %12s %10s' % ('benchmark', 'nodes', 'ms/move', 'nodes/s', 'peak KB')]
+    for result in results:
+        lines.append('%-28s %10d %10.3f %12.0f %10d' % (result['key'], result['nodes'], result['seconds'] * 1000,
+                                                        result['nodes_per_second'], result['peak_kb']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hw1 search strategies.')
+    parser.add_argument('--max-depth', type=int, default=5)
+    parser.add_argument('--random', type=int, default=3, help='number of seeded random boards')
+    parser.add_argument('--stones', type=int, default=10, help='stones pre-placed on random boards')
+    parser.add_argument('--seed', type=int, default=561)
+    parser.add_argument('--repeat', type=int, default=5, help='best-of-N timing, capped at about a second')
+    parser.add_argument('--baseline', default=BASELINE, help='node counts every run must reproduce')
+    parser.add_argument('--previous', help='an earlier --output from this machine to compare timings against')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='timing and memory slack for --previous')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--output', help='write the measurements as JSON')
+    args = parser.parse_args()
+
+    failures = check_samples()
+    for failure in failures:
+        print 'sample output differs: %s' % failure
+
+    results = run_benchmarks(load_boards(args.random, args.seed, args.stones), args.max_depth, args.repeat)
+    print report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(dict((result['key'], {'nodes': result['nodes']}) for result in results), f, indent=2,
+                      sort_keys=True)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print 'regression: %s' % regression
+    if args.previous:
+        with open(args.previous, 'r') as f:
+            previous = dict((result['key'], result) for result in json.load(f))
+        for slower in compare_timings(results, previous, args.tolerance):
+            print 'slower: %s' % slower
+
+    if failures or regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,144 +1,291 @@
+import random
+
 SIZE = 5
 EMPTY = '*'
+ZOBRIST_SEED = 561
+
+
+def bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def column_name(column):
+    name = ''
+    column += 1
+    while column:
+        column, remainder = divmod(column - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+class Geometry:
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.moves = tuple(self.location_of(index) for index in range(self.cells))
+        self.neighbors = tuple(self.neighbor_indexes(index) for index in range(self.cells))
+        self.neighbor_masks = tuple(sum(1 << n for n in neighbors) for neighbors in self.neighbors)
+        self.empty_values = (0,) * self.cells
+        self.columns = tuple(column_name(column) for column in range(size))
+        zobrist_random = random.Random(ZOBRIST_SEED + size)
+        self.zobrist = {'X': tuple(zobrist_random.getrandbits(64) for _ in range(self.cells)),
+                        'O': tuple(zobrist_random.getrandbits(64) for _ in range(self.cells))}
+        self.turn_keys = {'X': 0, 'O': zobrist_random.getrandbits(64)}
+
+    def index_of(self, location):
+        return location[0] * self.size + location[1]
+
+    def location_of(self, index):
+        return divmod(index, self.size)
+
+    def in_bounds(self, location):
+        return 0 <= location[0] < self.size and 0 <= location[1] < self.size
+
+    def neighbor_indexes(self, index):
+        i, j = self.location_of(index)
+        candidates = [(i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)]
+        return tuple(self.index_of(location) for location in candidates if self.in_bounds(location))
+
+    def zobrist_of(self, mask, player):
+        keys = self.zobrist[player]
+        key = 0
+        for index in bits(mask):
+            key ^= keys[index]
+        return key
+
+
+geometries = {}
+
+
+def geometry(size):
+    shape = geometries.get(size)
+    if shape is None:
+        shape = Geometry(size)
+        geometries[size] = shape
+    return shape
 
 
 class Board:
-    def __init__(self):
-        self.size = SIZE
-        self.board = [[''] * SIZE for _ in range(SIZE)]
-        self.for_each_cell(lambda (i, j), cell: self.set_cell((i, j), Status(0, EMPTY, (i, j))))
+    clones = 0
+
+    def __init__(self, values=None, x=0, o=0, scores=None, hash=None, size=SIZE):
+        self.geometry = geometry(size)
+        self.size = size
+        if values is None:
+            values = self.geometry.empty_values
+        self.values = values
+        self.x = x
+        self.o = o
+        if scores is None:
+            scores = (self.score(x), self.score(o))
+        self.x_score, self.o_score = scores
+        if hash is None:
+            hash = self.geometry.zobrist_of(x, 'X') ^ self.geometry.zobrist_of(o, 'O')
+        self.hash = hash
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['geometry']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.geometry = geometry(self.size)
+
+    def mask_of(self, player):
+        if player == 'X':
+            return self.x
+        elif player == 'O':
+            return self.o
+        else:
+            return self.free_mask()
+
+    def player_at(self, index):
+        bit = 1 << index
+        if self.x & bit:
+            return 'X'
+        elif self.o & bit:
+            return 'O'
+        else:
+            return EMPTY
 
     def set_cell(self, location, status):
-        self.board[location[0]][location[1]] = status
+        index = self.geometry.index_of(location)
+        self.place(index, EMPTY)
+        values = list(self.values)
+        values[index] = status.value
+        self.values = tuple(values)
+        self.place(index, status.player)
 
     def set_player(self, location, player):
-        (self.board[location[0]][location[1]]).player = player
+        self.place(self.geometry.index_of(location), player)
+
+    def place(self, index, player):
+        bit = 1 << index
+        value = self.values[index]
+        zobrist = self.geometry.zobrist
+        if self.x & bit:
+            self.x &= ~bit
+            self.x_score -= value
+            self.hash ^= zobrist['X'][index]
+        elif self.o & bit:
+            self.o &= ~bit
+            self.o_score -= value
+            self.hash ^= zobrist['O'][index]
+        if player == 'X':
+            self.x |= bit
+            self.x_score += value
+            self.hash ^= zobrist['X'][index]
+        elif player == 'O':
+            self.o |= bit
+            self.o_score += value
+            self.hash ^= zobrist['O'][index]
+
+    def flip(self, mask, player):
+        zobrist_of = self.geometry.zobrist_of
+        if player == 'X':
+            self.x_score += self.score(mask & ~self.x)
+            self.o_score -= self.score(mask & self.o)
+            self.hash ^= zobrist_of(mask & ~self.x, 'X') ^ zobrist_of(mask & self.o, 'O')
+            self.x |= mask
+            self.o &= ~mask
+        else:
+            self.o_score += self.score(mask & ~self.o)
+            self.x_score -= self.score(mask & self.x)
+            self.hash ^= zobrist_of(mask & ~self.o, 'O') ^ zobrist_of(mask & self.x, 'X')
+            self.o |= mask
+            self.x &= ~mask
 
     def raid(self, location, player):
         new_board = self.clone()
-        to_raid = new_board.cell_at(location)
-        if (not new_board.adjacent_cells(location, player)) or to_raid.is_occupied():
+        index = self.geometry.index_of(location)
+        neighbors = self.geometry.neighbor_masks[index]
+        if (not neighbors & self.mask_of(player)) or (self.x | self.o) & (1 << index):
             return new_board
-        new_board.set_player(location, player)
-        opponent_cells = new_board.adjacent_opponent_cells(location, player)
-        for opponent_cell in opponent_cells:
-            new_board.set_player(opponent_cell.location, player)
-
+        captured = neighbors & self.mask_of(toggle_player(player))
+        new_board.flip((1 << index) | captured, player)
         return new_board
 
     def sneak(self, location, player):
         new_board = self.clone()
-        to_sneak = new_board.cell_at(location)
-        if to_sneak.is_occupied():
-            return new_board
-        if new_board.adjacent_cells(location, player):
-            return new_board.raid(location, player)
-
-        new_board.set_player(location, player)
+        new_board.apply_move(location, player)
         return new_board
 
+    def apply_move(self, location, player):
+        index = self.geometry.index_of(location)
+        placed = 1 << index
+        if (self.x | self.o) & placed:
+            return player, 0, 0
+        captured = self.raid_targets(index, player)
+        self.flip(placed | captured, player)
+        return player, placed, captured
+
+    def raid_targets(self, index, player):
+        neighbors = self.geometry.neighbor_masks[index]
+        if neighbors & self.mask_of(player):
+            return neighbors & self.mask_of(toggle_player(player))
+        return 0
+
+    def undo_move(self, record):
+        player, placed, captured = record
+        changed = placed | captured
+        zobrist_of = self.geometry.zobrist_of
+        self.hash ^= zobrist_of(changed, player) ^ zobrist_of(captured, toggle_player(player))
+        if player == 'X':
+            self.x_score -= self.score(changed)
+            self.o_score += self.score(captured)
+            self.x &= ~changed
+            self.o |= captured
+        else:
+            self.o_score -= self.score(changed)
+            self.x_score += self.score(captured)
+            self.o &= ~changed
+            self.x |= captured
+
     def for_each_cell(self, fn):
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 fn((i, j), self.cell_at((i, j)))
 
     def all_cells(self):
         cells = []
-        for i in range(SIZE):
-            for j in range(SIZE):
+        for i in range(self.size):
+            for j in range(self.size):
                 cells.append(self.cell_at((i, j)))
         return cells
 
     def __str__(self):
         str = ""
-        for row in self.board:
-            for cell in row:
-                str += (cell.__str__())
+        for i in range(self.size):
+            for j in range(self.size):
+                str += self.player_at(i * self.size + j)
             str += '\n'
         return str
 
     def __eq__(self, other):
-        return self.__str__() == other.__str__()
+        return self.x == other.x and self.o == other.o
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def location_name(self, location):
-        rows = ['A', 'B', 'C', 'D', 'E']
-        return rows[location[1]] + str(location[0] + 1)
+        return self.geometry.columns[location[1]] + str(location[0] + 1)
 
     def free_neighbors(self, player):
-        neighbors = []
-        for i in range(SIZE):
-            for j in range(SIZE):
-                location = (i, j)
-                cell = self.cell_at(location)
-                if cell and (not cell.is_occupied()) and self.adjacent_cells(location, player):
-                    neighbors.append(cell)
-        return neighbors
+        moves = self.geometry.moves
+        neighbor_masks = self.geometry.neighbor_masks
+        return [self.cell_at(moves[index]) for index in bits(self.free_mask())
+                if neighbor_masks[index] & self.mask_of(player)]
 
     def adjacent_opponent_cells(self, location, player):
-        i = location[0]
-        j = location[1]
-        adjacent = []
-        possible_cells = [self.cell_at((i - 1, j)), self.cell_at((i + 1, j)), self.cell_at((i, j - 1)),
-                          self.cell_at((i, j + 1))]
-        for cell in possible_cells:
-            if cell and cell.player != player and cell.is_occupied():
-                adjacent.append(cell)
-        return adjacent
+        index = self.geometry.index_of(location)
+        opponent = self.mask_of(toggle_player(player))
+        moves = self.geometry.moves
+        return [self.cell_at(moves[n]) for n in self.geometry.neighbors[index] if opponent & (1 << n)]
 
     def adjacent_cells(self, location, player):
-        i = location[0]
-        j = location[1]
-        adjacent = []
-        possible_cells = [self.cell_at((i - 1, j)), self.cell_at((i + 1, j)), self.cell_at((i, j - 1)),
-                          self.cell_at((i, j + 1))]
-        for cell in possible_cells:
-            if cell and cell.player == player:
-                adjacent.append(cell)
-        return adjacent
+        index = self.geometry.index_of(location)
+        mask = self.mask_of(player)
+        moves = self.geometry.moves
+        return [self.cell_at(moves[n]) for n in self.geometry.neighbors[index] if mask & (1 << n)]
+
+    def score(self, mask):
+        values = self.values
+        return sum(values[index] for index in bits(mask))
 
     def evaluate(self, player):
-        player_score = reduce(
-                lambda acc, row: acc + reduce(
-                        lambda row_acc, cell: cell.value + row_acc if cell.player == player else row_acc, row,
-                        0),
-                self.board, 0)
-        opponent_score = reduce(
-                lambda acc, row: acc + reduce(
-                        lambda row_acc,
-                               cell: cell.value + row_acc if cell.is_occupied() and cell.player != player else row_acc,
-                        row,
-                        0),
-                self.board, 0)
-        return player_score - opponent_score
+        if player == 'X':
+            return self.x_score - self.o_score
+        else:
+            return self.o_score - self.x_score
 
     def cell_at(self, location):
-        i = location[0]
-        j = location[1]
-        if i < 0 or j < 0 or i > 4 or j > 4:
+        if not self.geometry.in_bounds(location):
             return None
 
-        return self.board[i][j]
+        index = self.geometry.index_of(location)
+        return Status(self.values[index], self.player_at(index), location)
 
     def clone(self):
-        board = Board()
-        for i in range(SIZE):
-            for j in range(SIZE):
-                board.set_cell((i, j), self.cell_at((i, j)).clone())
-        return board
+        Board.clones += 1
+        return Board(self.values, self.x, self.o, (self.x_score, self.o_score), self.hash, self.size)
+
+    def zobrist_key(self, player):
+        return self.hash ^ self.geometry.turn_keys[player]
+
+    def free_mask(self):
+        return self.geometry.full & ~(self.x | self.o)
 
     def valid_moves(self, player):
-        moves = []
-        for i in range(SIZE):
-            for j in range(SIZE):
-                if self.sneak((i, j), player) != self:
-                    moves.append((i, j))
-        return moves
+        moves = self.geometry.moves
+        return [moves[index] for index in bits(self.free_mask())]
 
     def is_over(self):
-        return reduce(lambda acc, cell: acc and cell.is_occupied(), self.all_cells(), True)
+        return (self.x | self.o) == self.geometry.full
 
     def winner(self):
         if self.evaluate('X') > 0:
@@ -147,6 +294,27 @@ class Board:
             return 'O'
 
 
+def toggle_player(player):
+    if player == 'X':
+        return 'O'
+    else:
+        return 'X'
+
+
+def get_board_input(lines, start_index):
+    size = len(lines[start_index].strip().split(' '))
+    values = []
+    x = o = 0
+    for i in range(size):
+        values += map(int, lines[start_index + i].strip().split(' '))
+        for j, player in enumerate(lines[start_index + size + i].strip()):
+            if player == 'X':
+                x |= 1 << (i * size + j)
+            elif player == 'O':
+                o |= 1 << (i * size + j)
+    return Board(tuple(values), x, o, size=size)
+
+
 class Status:
     def __init__(self, value, player, location):
         self.value = value
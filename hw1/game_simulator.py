@@ -1,14 +1,27 @@
+import time
+
+
 class GameSimulator:
     def __init__(self, board, players):
         self.board = board
         self.players = players
+        self.move_times = [[], []]
+        self.nodes = [0, 0]
 
     def play(self):
         turn = 0
         trace_states = []
         board = self.board
         while not board.is_over():
-            board = self.players[turn].move(board)[1]
+            player = self.players[turn]
+            nodes = getattr(player, 'nodes', 0)
+            start = time.time()
+            next_board = player.move(board)[1]
+            self.move_times[turn].append(time.time() - start)
+            self.nodes[turn] += getattr(player, 'nodes', 0) - nodes
+            if next_board == board:
+                break
+            board = next_board
             trace_states.append(board)
             turn = (turn + 1) % 2
 
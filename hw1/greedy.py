@@ -1,13 +1,28 @@
+from batch_eval import available, move_scores
+
+
 class GreedyStrategy:
     def __init__(self, player):
         self.player = player
+        self.nodes = 0
 
     def move(self, board):
+        if available():
+            return [], self.batch_move(board)
         best_position = (board, board.evaluate(self.player))
         for i in range(board.size):
             for j in range(board.size):
                 new_state = board.sneak((i, j), self.player)
                 new_evaluation = new_state.evaluate(self.player)
+                self.nodes += 1
                 if new_evaluation > best_position[1]:
                     best_position = (new_state, new_evaluation)
         return [], best_position[0]
+
+    def batch_move(self, board):
+        scores = move_scores(board, self.player)
+        self.nodes += len(scores)
+        best = scores.argmax()
+        if scores[best] > board.evaluate(self.player):
+            return board.sneak(board.geometry.moves[best], self.player)
+        return board
@@ -1,12 +1,18 @@
+import argparse
+import json
+import os
 import sys
+import traceback
 
-from alpha_beta import AlphaBetaStrategy
-from board import Board
-from board import SIZE
-from board import Status
+from board import get_board_input
 from game_simulator import GameSimulator
-from greedy import GreedyStrategy
-from min_max import MinMaxStrategy
+from position_cache import CachedStrategy, DEFAULT_ENTRIES, PositionCache
+from search_stats import SearchStats
+from tournament import applicable_options, close_strategies, make_strategy
+from trace_sink import ALPHABETA_HEADER, FileSink, MemorySink, MINMAX_HEADER
+
+STRATEGY_NAMES = {'1': 'greedy', '2': 'minimax', '3': 'alphabeta', '5': 'mcts', '6': 'pvs'}
+TRACE_HEADERS = {'2': MINMAX_HEADER, '3': ALPHABETA_HEADER}
 
 
 def write_next_state(board, file):
@@ -22,76 +28,193 @@ def write_states(states, file):
             f.writelines(state.__str__())
 
 
-def get_board_input(lines, start_index):
-    values = map(lambda line: line.strip().split(' '), lines[start_index:start_index + 5])
-    position = map(lambda line: list(line.strip()), lines[start_index + 5:start_index + 10])
-    board = Board()
-    for i in range(SIZE):
-        for j in range(SIZE):
-            board.set_cell((i, j), Status(int(values[i][j]), position[i][j], (i, j)))
-    return board
-
-
-def transform_inf(value):
-    if value == float('-inf'):
-        return '-Infinity'
-    elif value == float('inf'):
-        return 'Infinity'
-    else:
-        return value
-
-
 def write_minmax_trace_log(move_trace, file):
-    with open(file, 'w') as f:
-        f.truncate()
-        f.write('Node,Depth,Value\n')
-        for move in move_trace:
-            f.write("%s,%s,%s\n" % (move[0], move[1], transform_inf(move[2])))
+    sink = FileSink(file, MINMAX_HEADER)
+    sink.extend(move_trace)
+    sink.close()
 
 
 def write_alphabeta_trace_log(move_trace, file):
-    with open(file, 'w') as f:
-        f.truncate()
-        f.write('Node,Depth,Value,Alpha,Beta\n')
-        for move in move_trace:
-            f.write("%s,%s,%s,%s,%s\n" % (
-                move[0], move[1], transform_inf(move[2]), transform_inf(move[3]), transform_inf(move[4])))
-
-
-input_file = sys.argv[2]
-with open(input_file, 'r') as fin:
-    lines = fin.readlines()
-
-search_strategy = lines[0].strip()
-
-
-def get_strategy(strategy, player, depth):
-    if strategy == '1':
-        return GreedyStrategy(player)
-    elif strategy == '2':
-        return MinMaxStrategy(player, depth)
-    else:
-        return AlphaBetaStrategy(player, depth)
-
-
-if search_strategy != '4':
-    player = lines[1].strip()
-    depth = int(lines[2].strip())
-    board = get_board_input(lines, 3)
-    if search_strategy == '1':
-        trace, next_state = GreedyStrategy(player).move(board)
-        write_next_state(next_state, 'next_state.txt')
-    elif search_strategy == '2':
-        move_trace, next_state = MinMaxStrategy(player, depth).move(board)
-        write_next_state(next_state, 'next_state.txt')
-        write_minmax_trace_log(move_trace, 'traverse_log.txt')
-    elif search_strategy == '3':
-        move_trace, next_state = AlphaBetaStrategy(player, depth).move(board)
-        write_next_state(next_state, 'next_state.txt')
-        write_alphabeta_trace_log(move_trace, 'traverse_log.txt')
-else:
-    players = [get_strategy(lines[2].strip(), lines[1].strip(), int(lines[3].strip())),
-               get_strategy(lines[5].strip(), lines[4].strip(), int(lines[6].strip()))]
-    board = get_board_input(lines, 7)
-    states, final_state = GameSimulator(board, players).play()
-    write_states(states, 'trace_state.txt')
+    sink = FileSink(file, ALPHABETA_HEADER)
+    sink.extend(move_trace)
+    sink.close()
+
+
+def get_strategy(strategy, player, depth, stats=None, cache=None, options=(), sink=None):
+    name = STRATEGY_NAMES.get(strategy, 'alphabeta')
+    applicable = applicable_options(name, options)
+    config = ':'.join(['%s:%d' % (name, depth)] + applicable)
+    if cache is None:
+        return make_strategy(config, player, stats, sink)
+    search = make_strategy(config, player, stats, None if sink is None else MemorySink())
+    key_name = strategy
+    if sink is not None:
+        # a transposition table changes the trace, but not the move
+        key_name = ':'.join([strategy, 'trace'] + [option for option in applicable if option == 'tt'])
+    return CachedStrategy(search, cache, key_name, depth, sink)
+
+
+def cache_conflict(search_strategy, players, options):
+    names = [STRATEGY_NAMES.get(code, 'alphabeta') for code, player, depth in players]
+    if search_strategy == '4' and 'mcts' in names:
+        return 'MCTS moves in a game depend on the moves before them'
+    timed = [name for name in names if 'time' in applicable_options(name, ['time'])]
+    if timed and any(option.startswith('time=') for option in options):
+        return 'a time limit makes %s moves depend on the speed of the host' % timed[0]
+    return None
+
+
+def read_input(file):
+    with open(file, 'r') as fin:
+        return fin.readlines()
+
+
+def parse_input(lines):
+    search_strategy = lines[0].strip()
+    if search_strategy == '4':
+        players = [(lines[2].strip(), lines[1].strip(), int(lines[3].strip())),
+                   (lines[5].strip(), lines[4].strip(), int(lines[6].strip()))]
+        return search_strategy, players, get_board_input(lines, 7)
+    return search_strategy, [(search_strategy, lines[1].strip(), int(lines[2].strip()))], get_board_input(lines, 3)
+
+
+def run(lines, output_dir='.', stats=None, cache=None, options=()):
+    search_strategy, players, board = parse_input(lines)
+    if cache is not None:
+        conflict = cache_conflict(search_strategy, players, options)
+        if conflict is not None:
+            raise ValueError('--cache does not apply: %s' % conflict)
+    if search_strategy == '4':
+        strategies = [get_strategy(code, player, depth, stats, cache, options) for code, player, depth in players]
+        try:
+            states = GameSimulator(board, strategies).play()
+        finally:
+            close_strategies(strategies)
+        write_states(states, os.path.join(output_dir, 'trace_state.txt'))
+        return states
+
+    if search_strategy not in STRATEGY_NAMES:
+        return None
+    code, player, depth = players[0]
+    sink = None
+    strategy = None
+    try:
+        if search_strategy in TRACE_HEADERS:
+            sink = FileSink(os.path.join(output_dir, 'traverse_log.txt'), TRACE_HEADERS[search_strategy])
+        strategy = get_strategy(search_strategy, player, depth, stats, cache, options, sink)
+        trace, next_state = strategy.move(board)
+    finally:
+        if strategy is not None:
+            close_strategies([strategy])
+        if sink is not None:
+            sink.close()
+    write_next_state(next_state, os.path.join(output_dir, 'next_state.txt'))
+    return next_state
+
+
+def output_name(name):
+    return os.path.normpath(name).replace(os.sep, '_').lstrip('._')
+
+
+def input_name(file):
+    return output_name(os.path.splitext(os.path.normpath(file))[0])
+
+
+def batch_inputs(files, jsonl):
+    for file in files:
+        yield input_name(file), read_input(file)
+    if jsonl is not None:
+        stream = sys.stdin if jsonl == '-' else open(jsonl, 'r')
+        for n, line in enumerate(stream):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            yield output_name(str(request.get('name', n))) or str(n), request['input'].splitlines(True)
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(inputs, output_root, stats=None, cache=None, options=()):
+    failures = []
+    seen = set()
+    for name, lines in inputs:
+        if name in seen:
+            failures.append('%s (duplicate name)' % name)
+            continue
+        seen.add(name)
+        output_dir = os.path.join(output_root, name)
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        try:
+            run(lines, output_dir, stats, cache, options)
+        except Exception:
+            failures.append(name)
+            with open(os.path.join(output_dir, 'error.txt'), 'w') as f:
+                traceback.print_exc(file=f)
+    return failures
+
+
+def search_options(args):
+    options = []
+    if args.tt:
+        options.append('tt')
+    if args.workers:
+        options.append('workers=%d' % args.workers)
+    if args.batch_leaves:
+        options.append('batch')
+    if args.time_limit:
+        options.append('time=%r' % args.time_limit)
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play the next move, or a whole game, for a hw1 input file.')
+    parser.add_argument('-i', dest='input', help='input file, outputs go to the current directory')
+    parser.add_argument('--batch', metavar='DIR', help='solve every input into DIR/<name>/ in one process')
+    parser.add_argument('--jsonl', help='with --batch, a JSONL file (or - for stdin) of {"name", "input"} objects')
+    parser.add_argument('inputs', nargs='*', help='with --batch, input files')
+    parser.add_argument('--stats', help='write search statistics as JSON')
+    parser.add_argument('--cache', help='persistent position cache file, also replays traverse_log.txt')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_ENTRIES)
+    parser.add_argument('--tt', action='store_true', help='give alpha-beta searches a transposition table')
+    parser.add_argument('--workers', type=int, help='split minimax and alpha-beta root moves over N processes')
+    parser.add_argument('--time-limit', type=float, metavar='SECONDS',
+                        help='deepen alpha-beta searches, or run MCTS playouts, until SECONDS per move, up to '
+                             'the input depth; traverse_log.txt holds the deepest search that finished')
+    parser.add_argument('--batch-leaves', action='store_true',
+                        help='score the last ply of minimax and alpha-beta searches in one vectorized call')
+    args = parser.parse_args()
+    if not args.batch and not args.input:
+        parser.error('either -i or --batch is required')
+
+    options = search_options(args)
+    lines = None if args.batch else read_input(args.input)
+    if args.cache and lines is not None:
+        search_strategy, players, board = parse_input(lines)
+        conflict = cache_conflict(search_strategy, players, options)
+        if conflict is not None:
+            parser.error('--cache does not apply: %s' % conflict)
+    stats = SearchStats() if args.stats else None
+    cache = PositionCache(args.cache, args.cache_size) if args.cache else None
+    failures = []
+    try:
+        if args.batch:
+            inputs = batch_inputs(([args.input] if args.input else []) + args.inputs, args.jsonl)
+            failures = run_batch(inputs, args.batch, stats, cache, options)
+        else:
+            run(lines, '.', stats, cache, options)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if stats is not None:
+        print stats.summary()
+        stats.dump(args.stats)
+    for name in failures:
+        print 'input failed: %s' % name
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+import math
+import random
+import time
+
+from board import toggle_player
+
+EXPLORATION = math.sqrt(2)
+DEFAULT_PLAYOUTS = 1000
+PLAYOUTS_PER_DEPTH = 500
+ROLLOUT_SAMPLES = 3
+SEED = 561
+
+
+def reward(margin, mover):
+    # win/loss rather than margin / sum(values), which stays so close to 0.5 that exploration swamps it
+    if margin == 0:
+        return 0.5
+    if (margin > 0) == (mover == 'X'):
+        return 1.0
+    return 0.0
+
+
+class Node:
+    def __init__(self, move, mover, parent, untried, key):
+        self.move = move
+        self.mover = mover
+        self.parent = parent
+        self.untried = untried
+        self.key = key
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits +
+                   EXPLORATION * math.sqrt(log_visits / child.visits))
+
+    def most_visited(self):
+        return max(self.children, key=lambda child: child.visits)
+
+
+class MCTSStrategy:
+    def __init__(self, player, playouts=DEFAULT_PLAYOUTS, time_limit=None, seed=SEED):
+        self.player = player
+        if playouts is None and time_limit is None:
+            playouts = DEFAULT_PLAYOUTS
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.random = random.Random(seed)
+        self.root = None
+        self.values = None
+        self.nodes = 0
+
+    def move(self, board):
+        root = self.reuse_root(board)
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+        playouts = 0
+        while root.untried or root.children:
+            if self.playouts is not None and playouts >= self.playouts:
+                break
+            if deadline is not None and time.time() > deadline:
+                break
+            self.playout(root, board.clone())
+            playouts += 1
+        self.nodes += playouts
+        if not root.children:
+            self.root = None
+            return [], board
+        best = root.most_visited()
+        best.parent = None
+        self.root = best
+        return [], board.sneak(best.move, self.player)
+
+    def new_node(self, move, mover, parent, state):
+        untried = state.valid_moves(mover)
+        self.random.shuffle(untried)
+        return Node(move, mover, parent, untried, (state.x, state.o))
+
+    def reuse_root(self, board):
+        key = (board.x, board.o)
+        if self.root is not None and board.values == self.values:
+            for child in self.root.children:
+                if child.key == key:
+                    child.parent = None
+                    return child
+        self.values = board.values
+        return self.new_node(None, toggle_player(self.player), None, board)
+
+    def playout(self, root, state):
+        node = root
+        while not node.untried and node.children:
+            node = node.select()
+            state.apply_move(node.move, node.mover)
+        if node.untried:
+            move = node.untried.pop()
+            mover = toggle_player(node.mover)
+            state.apply_move(move, mover)
+            child = self.new_node(move, mover, node, state)
+            node.children.append(child)
+            node = child
+        margin = self.rollout(state, toggle_player(node.mover))
+        while node is not None:
+            node.visits += 1
+            node.wins += reward(margin, node.mover)
+            node = node.parent
+
+    def rollout(self, state, player):
+        moves = state.valid_moves(player)
+        index_of = state.geometry.index_of
+        randrange = self.random.randrange
+        while moves:
+            best, best_gain = None, None
+            for _ in range(min(ROLLOUT_SAMPLES, len(moves))):
+                n = randrange(len(moves))
+                index = index_of(moves[n])
+                gain = state.values[index] + 2 * state.score(state.raid_targets(index, player))
+                if best_gain is None or gain > best_gain:
+                    best, best_gain = n, gain
+            moves[best], moves[-1] = moves[-1], moves[best]
+            state.apply_move(moves.pop(), player)
+            player = toggle_player(player)
+        return state.evaluate('X')
@@ -1,3 +1,10 @@
+import time
+
+from batch_eval import leaf_scores
+from parallel import record_result, RootSplitter, search_min_max
+from trace_sink import NullSink
+
+
 def toggle_player(player):
     if player == 'X':
         return 'O'
@@ -6,29 +13,94 @@ def toggle_player(player):
 
 
 class MinMaxStrategy:
-    def __init__(self, player, depth):
+    def __init__(self, player, depth, workers=None, sink=None, batch_leaves=False, stats=None):
         self.player = player
         self.depth = depth
+        self.workers = workers
+        self.splitter = None
+        self.sink = sink
+        self.tracing = not isinstance(sink, NullSink)
+        self.batch_leaves = batch_leaves
+        self.stats = stats
+        self.nodes = 0
+        self.value = None
         self.trace = []
 
+    def close(self):
+        if self.splitter is not None:
+            self.splitter.close()
+            self.splitter = None
+
+    def start_trace(self, row):
+        self.trace = self.sink if self.sink is not None else []
+        self.tracing = not isinstance(self.sink, NullSink)
+        self.trace.append(row)
+
     def move(self, board):
+        if self.stats is not None:
+            self.stats.start()
+        if self.workers:
+            result = self.parallel_move(board)
+        else:
+            result = self.serial_move(board)
+        if self.stats is not None:
+            self.stats.finish()
+        return result
+
+    def serial_move(self, board):
         next_best_move = board
         current_max = float('-Infinity')
-        self.trace = [('root', 0, current_max)]
+        self.start_trace(('root', 0, current_max))
         moves = board.valid_moves(self.player)
         for move in moves:
+            started, nodes = time.time(), self.nodes
             next_level_evaluation = self.traverse_next_level(board, move, 1, self.player)
+            if self.stats is not None:
+                self.stats.root_move(board.location_name(move), self.depth, next_level_evaluation,
+                                     time.time() - started, self.nodes - nodes)
+            if next_level_evaluation > current_max:
+                current_max = next_level_evaluation
+                next_best_move = board.sneak(move, self.player)
+            self.trace.append(('root', 0, current_max))
+        self.value = current_max
+        return self.trace, next_best_move
+
+    def parallel_move(self, board):
+        next_best_move = board
+        current_max = float('-Infinity')
+        self.start_trace(('root', 0, current_max))
+        moves = board.valid_moves(self.player)
+        if self.splitter is None:
+            self.splitter = RootSplitter(self.workers)
+        results = self.splitter.map(search_min_max, self, board, moves)
+        for move, result in zip(moves, results):
+            next_level_evaluation, subtree_trace = record_result(self, board, move, result)
+            self.trace.extend(subtree_trace)
             if next_level_evaluation > current_max:
                 current_max = next_level_evaluation
                 next_best_move = board.sneak(move, self.player)
             self.trace.append(('root', 0, current_max))
+        self.value = current_max
         return self.trace, next_best_move
 
+    def leaf(self, board, move, current_depth, evaluation):
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(current_depth)
+        if self.tracing:
+            self.trace.append((board.location_name(move), current_depth, evaluation))
+        return evaluation
+
     def traverse_next_level(self, board, move, current_depth, player):
-        state = board.sneak(move, player)
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(current_depth)
+        undo = board.apply_move(move, player)
         if current_depth == self.depth:
-            next_state_evaluation = state.evaluate(self.player)
-            self.trace.append((state.location_name(move), current_depth, next_state_evaluation))
+            next_state_evaluation = board.evaluate(self.player)
+            if self.tracing:
+                self.trace.append((board.location_name(move), current_depth, next_state_evaluation))
+            board.undo_move(undo)
             return next_state_evaluation
         else:
             should_minimize = current_depth % 2 == 1
@@ -37,13 +109,20 @@ class MinMaxStrategy:
             else:
                 value = float('-Infinity')
 
-            next_moves = state.valid_moves(player)
+            next_moves = board.valid_moves(player)
+            leaves = None
+            if self.batch_leaves and current_depth + 1 == self.depth:
+                leaves = leaf_scores(board, next_moves, toggle_player(player), self.player)
 
-            for next_move in next_moves:
-                self.trace.append((board.location_name(move), current_depth, value))
-                next_state_evaluation = self.traverse_next_level(board.sneak(move, player), next_move,
-                                                                 current_depth + 1,
-                                                                 toggle_player(player))
+            for n, next_move in enumerate(next_moves):
+                if self.tracing:
+                    self.trace.append((board.location_name(move), current_depth, value))
+                if leaves is not None:
+                    next_state_evaluation = self.leaf(board, next_move, current_depth + 1, leaves[n])
+                else:
+                    next_state_evaluation = self.traverse_next_level(board, next_move,
+                                                                     current_depth + 1,
+                                                                     toggle_player(player))
                 if should_minimize:
                     if next_state_evaluation < value:
                         value = next_state_evaluation
@@ -51,5 +130,7 @@ class MinMaxStrategy:
                     if next_state_evaluation > value:
                         value = next_state_evaluation
 
-            self.trace.append((board.location_name(move), current_depth, value))
+            if self.tracing:
+                self.trace.append((board.location_name(move), current_depth, value))
+        board.undo_move(undo)
         return value
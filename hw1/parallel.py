@@ -0,0 +1,96 @@
+import multiprocessing
+import time
+
+from search_stats import SearchStats
+from trace_sink import NullSink
+from transposition import TranspositionTable
+
+INFINITY = float('Infinity')
+TIE_MARGIN = 1
+
+shared_bound = None
+
+
+def init_worker(bound):
+    global shared_bound
+    shared_bound = bound
+
+
+def read_bound():
+    bound = shared_bound.value
+    if bound == -INFINITY:
+        return bound
+    # evaluations are integral, so searching one below the bound keeps ties exact
+    return int(bound) - TIE_MARGIN
+
+
+def publish_bound(value):
+    with shared_bound.get_lock():
+        if value > shared_bound.value:
+            shared_bound.value = value
+
+
+def worker_strategy(job):
+    strategy_class, player, depth, settings = job[:4]
+    kwargs = {'batch_leaves': settings['batch_leaves']}
+    if not settings['tracing']:
+        kwargs['sink'] = NullSink()
+    if settings['stats']:
+        kwargs['stats'] = SearchStats()
+    if settings['table']:
+        # a fresh table per subtree keeps the trace independent of which jobs a worker ran before
+        kwargs['table'] = TranspositionTable()
+    return strategy_class(player, depth, **kwargs)
+
+
+def worker_result(strategy, value, started):
+    return value, strategy.trace, strategy.nodes, time.time() - started, strategy.stats
+
+
+def search_min_max(job):
+    strategy = worker_strategy(job)
+    board, move = job[4:6]
+    started = time.time()
+    value = strategy.traverse_next_level(board, move, 1, strategy.player)
+    return worker_result(strategy, value, started)
+
+
+def search_alpha_beta(job):
+    strategy = worker_strategy(job)
+    board, move, bound = job[4:]
+    started = time.time()
+    alpha = read_bound() if bound is None else bound
+    value = strategy.traverse_next_level(board, move, 1, strategy.player, alpha, INFINITY)
+    publish_bound(value)
+    return worker_result(strategy, value, started)
+
+
+def record_result(strategy, board, move, result, root=True):
+    value, trace, nodes, seconds, stats = result
+    strategy.nodes += nodes
+    if stats is not None:
+        strategy.stats.merge(stats)
+        if root:
+            strategy.stats.root_move(board.location_name(move), strategy.depth, value, seconds, nodes)
+    return value, trace
+
+
+class RootSplitter:
+    def __init__(self, workers):
+        self.bound = multiprocessing.Value('d', -INFINITY)
+        self.pool = multiprocessing.Pool(workers, init_worker, (self.bound,))
+
+    def map(self, worker, strategy, board, moves, bounds=None, tracing=None):
+        self.bound.value = -INFINITY
+        settings = {'batch_leaves': strategy.batch_leaves, 'stats': strategy.stats is not None,
+                    'table': getattr(strategy, 'table', None) is not None,
+                    'tracing': strategy.tracing if tracing is None else tracing}
+        if bounds is None:
+            bounds = [None] * len(moves)
+        jobs = [(strategy.__class__, strategy.player, strategy.depth, settings, board, move, bound)
+                for move, bound in zip(moves, bounds)]
+        return self.pool.map(worker, jobs, chunksize=1)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,127 @@
+import anydbm
+import marshal
+import zlib
+
+from board import bits
+
+CACHE_VERSION = 1
+DEFAULT_ENTRIES = 100000
+EVICT_FRACTION = 0.1
+CLOCK = '__clock__'
+
+
+def cache_key(board, player, depth, strategy):
+    return 'v%d|%s|%d|%s|%x|%x|%s|%d' % (CACHE_VERSION, strategy, board.geometry.size,
+                                         ','.join(str(value) for value in board.values),
+                                         board.x, board.o, player, depth)
+
+
+def placed_move(board, next_state):
+    placed = board.free_mask() & ~next_state.free_mask()
+    for index in bits(placed):
+        return board.geometry.location_of(index)
+    return None
+
+
+def encode(stamp, move, value, trace=None):
+    location = '' if move is None else '%d,%d' % move
+    record = '%d|%s|%s' % (stamp, location, '' if value is None else repr(value))
+    if trace is None:
+        return record
+    return record + '|' + zlib.compress(marshal.dumps(trace))
+
+
+def decode(record):
+    fields = record.split('|', 3)
+    stamp, location, value = fields[:3]
+    move = tuple(int(n) for n in location.split(',')) if location else None
+    if not value:
+        value = None
+    elif value.lstrip('-').isdigit():
+        value = int(value)
+    else:
+        value = float(value)
+    trace = marshal.loads(zlib.decompress(fields[3])) if len(fields) > 3 else None
+    return int(stamp), move, value, trace
+
+
+class PositionCache:
+    def __init__(self, file, max_entries=DEFAULT_ENTRIES):
+        self.db = anydbm.open(file, 'c')
+        self.max_entries = max_entries
+        self.clock = int(self.db[CLOCK]) if self.db.has_key(CLOCK) else 0
+        self.hits = 0
+        self.misses = 0
+
+    def tick(self):
+        self.clock += 1
+        return self.clock
+
+    def lookup(self, key):
+        if not self.db.has_key(key):
+            self.misses += 1
+            return None
+        self.hits += 1
+        record = self.db[key]
+        stamp, location, rest = record.split('|', 2)
+        self.db[key] = '%d|%s|%s' % (self.tick(), location, rest)
+        return decode(record)[1:]
+
+    def store(self, key, move, value, trace=None):
+        self.db[key] = encode(self.tick(), move, value, trace)
+        if self.entries() > self.max_entries:
+            self.evict()
+
+    def entries(self):
+        return len(self.db) - (1 if self.db.has_key(CLOCK) else 0)
+
+    def evict(self):
+        keep = int(self.max_entries * (1 - EVICT_FRACTION))
+        stamps = sorted((int(self.db[key].split('|', 1)[0]), key) for key in self.db.keys() if key != CLOCK)
+        for stamp, key in stamps[:len(stamps) - keep]:
+            del self.db[key]
+        reorganize = getattr(self.db, 'reorganize', None)
+        if reorganize is not None:
+            reorganize()
+
+    def close(self):
+        self.db[CLOCK] = str(self.clock)
+        self.db.close()
+
+
+class CachedStrategy:
+    def __init__(self, strategy, cache, name, depth=None, sink=None):
+        self.strategy = strategy
+        self.cache = cache
+        self.name = name
+        self.depth = strategy.depth if depth is None else depth
+        self.sink = sink
+        self.player = strategy.player
+        self.value = None
+        self.nodes = 0
+
+    def move(self, board):
+        key = cache_key(board, self.player, self.depth, self.name)
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            move, self.value, trace = cached
+            next_state = board if move is None else board.sneak(move, self.player)
+            if self.sink is None:
+                return [], next_state
+            self.sink.extend(trace)
+            return self.sink, next_state
+        nodes = self.strategy.nodes
+        trace, next_state = self.strategy.move(board)
+        self.nodes += self.strategy.nodes - nodes
+        self.value = getattr(self.strategy, 'value', None)
+        rows = None
+        if self.sink is not None:
+            rows = list(trace)
+            self.sink.extend(rows)
+            trace = self.sink
+        self.cache.store(key, placed_move(board, next_state), self.value, rows)
+        return trace, next_state
+
+    def close(self):
+        if hasattr(self.strategy, 'close'):
+            self.strategy.close()
@@ -0,0 +1,141 @@
+import time
+
+from alpha_beta import MoveOrdering, SearchTimeout, TIME_CHECK_INTERVAL
+from board import toggle_player
+from transposition import TranspositionTable
+
+ASPIRATION_WINDOW = 16
+INFINITY = float('Infinity')
+
+
+class PVSStrategy:
+    def __init__(self, player, depth, table=None, time_limit=None, window=ASPIRATION_WINDOW, stats=None):
+        self.player = player
+        self.depth = depth
+        self.table = table if table is not None else TranspositionTable()
+        self.time_limit = time_limit
+        self.window = window
+        self.stats = stats
+        self.deadline = None
+        self.nodes = 0
+        self.researches = 0
+        self.move_order = MoveOrdering()
+        self.best_move = None
+        self.value = None
+
+    def move(self, board):
+        if self.stats is not None:
+            self.stats.start()
+        self.table.new_search(board.values)
+        self.move_order = MoveOrdering()
+        self.deadline = None
+        search_board = board.clone()
+        moves = search_board.valid_moves(self.player)
+        best_move = None
+        values = {}
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+        for depth in range(1, self.depth + 1):
+            if not moves:
+                break
+            try:
+                values[depth] = self.aspiration(search_board, moves, depth, values.get(depth - 2))
+            except SearchTimeout:
+                break
+            best_move = self.best_move
+            self.value = values[depth]
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            self.deadline = deadline
+            if deadline is not None and time.time() > deadline:
+                break
+        self.deadline = None
+        if self.stats is not None:
+            self.stats.finish()
+        if best_move is None:
+            return [], board
+        return [], board.sneak(best_move, self.player)
+
+    def aspiration(self, board, moves, depth, guess):
+        if guess is None:
+            return self.search_root(board, moves, depth, -INFINITY, INFINITY)
+        window = self.window
+        alpha, beta = guess - window, guess + window
+        while True:
+            value = self.search_root(board, moves, depth, alpha, beta)
+            if value <= alpha:
+                alpha = value - window
+            elif value >= beta:
+                beta = value + window
+            else:
+                return value
+            self.researches += 1
+            window *= 2
+
+    def search_root(self, board, moves, depth, alpha, beta):
+        value = -INFINITY
+        self.best_move = None
+        for n, move in enumerate(moves):
+            started, nodes = time.time(), self.nodes
+            child_value = self.search_child(board, move, self.player, n == 0, depth - 1, alpha, beta, 1)
+            if self.stats is not None:
+                self.stats.root_move(board.location_name(move), depth, child_value,
+                                     time.time() - started, self.nodes - nodes)
+            if child_value > value:
+                value = child_value
+                self.best_move = move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return value
+
+    def search_child(self, board, move, player, first, remaining, alpha, beta, ply):
+        undo = board.apply_move(move, player)
+        opponent = toggle_player(player)
+        if first:
+            value = -self.search(board, remaining, opponent, -beta, -alpha, ply)
+        else:
+            value = -self.search(board, remaining, opponent, -alpha - 1, -alpha, ply)
+            if alpha < value < beta:
+                self.researches += 1
+                value = -self.search(board, remaining, opponent, -beta, -alpha, ply)
+        board.undo_move(undo)
+        return value
+
+    def search(self, board, remaining, player, alpha, beta, ply):
+        self.nodes += 1
+        if self.stats is not None:
+            self.stats.node(ply)
+        if self.deadline is not None and self.nodes % TIME_CHECK_INTERVAL == 0 and time.time() > self.deadline:
+            raise SearchTimeout()
+        if remaining == 0:
+            return board.evaluate(player)
+        if board.is_over():
+            return board.evaluate(player)
+
+        key = board.zobrist_key(player)
+        cached = self.table.lookup(key, remaining, alpha, beta)
+        if cached is not None:
+            return cached
+        entry = self.table.probe(key)
+        table_move = entry[4] if entry is not None else None
+
+        window = alpha
+        value = -INFINITY
+        best_move = None
+        for n, move in enumerate(self.move_order.order(board.valid_moves(player), player, ply, table_move)):
+            child_value = self.search_child(board, move, player, n == 0, remaining - 1, alpha, beta, ply + 1)
+            if child_value > value:
+                value = child_value
+                best_move = move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        if self.stats is not None:
+                            self.stats.cutoff(ply)
+                        self.move_order.record_cutoff(move, player, ply, remaining)
+                        break
+        self.table.store(key, remaining, window, beta, value, best_move)
+        return value
@@ -0,0 +1,92 @@
+import json
+import time
+
+from board import Board
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes = {}
+        self.cutoffs = {}
+        self.root_moves = []
+        self.clones = 0
+        self.searches = 0
+        self.wall_time = 0.0
+        self.started = None
+        self.clones_at_start = 0
+
+    def start(self):
+        self.searches += 1
+        self.started = time.time()
+        self.clones_at_start = Board.clones
+
+    def finish(self):
+        self.wall_time += time.time() - self.started
+        self.clones += Board.clones - self.clones_at_start
+
+    def node(self, depth):
+        self.nodes[depth] = self.nodes.get(depth, 0) + 1
+
+    def cutoff(self, depth):
+        self.cutoffs[depth] = self.cutoffs.get(depth, 0) + 1
+
+    def merge(self, other):
+        for depth, count in other.nodes.items():
+            self.nodes[depth] = self.nodes.get(depth, 0) + count
+        for depth, count in other.cutoffs.items():
+            self.cutoffs[depth] = self.cutoffs.get(depth, 0) + count
+
+    def root_move(self, name, depth, value, seconds, nodes):
+        self.root_moves.append({'move': name, 'depth': depth, 'value': value, 'seconds': seconds, 'nodes': nodes})
+
+    def total_nodes(self):
+        return sum(self.nodes.values())
+
+    def max_depth(self):
+        return max(self.nodes) if self.nodes else 0
+
+    def branching_factors(self):
+        factors = {}
+        previous = self.searches
+        for depth in sorted(self.nodes):
+            if previous:
+                factors[depth] = self.nodes[depth] / float(previous)
+            previous = self.nodes[depth]
+        return factors
+
+    def effective_branching_factor(self):
+        depth = self.max_depth()
+        if depth == 0:
+            return 0.0
+        return self.total_nodes() ** (1.0 / depth)
+
+    def nodes_per_second(self):
+        if self.wall_time == 0:
+            return 0.0
+        return self.total_nodes() / self.wall_time
+
+    def to_dict(self):
+        return {'nodes': self.nodes, 'cutoffs': self.cutoffs, 'clones': self.clones,
+                'searches': self.searches, 'wall_time': self.wall_time,
+                'total_nodes': self.total_nodes(), 'nodes_per_second': self.nodes_per_second(),
+                'branching_factors': self.branching_factors(),
+                'effective_branching_factor': self.effective_branching_factor(),
+                'root_moves': self.root_moves}
+
+    def dump(self, file):
+        with open(file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+    def summary(self):
+        lines = ['%5s %10s %10s %10s' % ('depth', 'nodes', 'cutoffs', 'branching')]
+        factors = self.branching_factors()
+        for depth in sorted(self.nodes):
+            lines.append('%5d %10d %10d %10.2f' % (depth, self.nodes[depth], self.cutoffs.get(depth, 0),
+                                                   factors.get(depth, 0.0)))
+        lines.append('nodes %d, clones %d, %.3fs, %.0f nodes/s, effective branching factor %.2f' % (
+            self.total_nodes(), self.clones, self.wall_time, self.nodes_per_second(),
+            self.effective_branching_factor()))
+        for root in self.root_moves:
+            lines.append('%-5s depth %-3d value %-10s %8d nodes %.4fs' % (
+                root['move'], root['depth'], root['value'], root['nodes'], root['seconds']))
+        return '\n'.join(lines)
@@ -0,0 +1,99 @@
+import random
+import time
+import unittest
+
+from alpha_beta import AlphaBetaStrategy
+from tournament import make_strategy, play_game, random_board, random_boards
+from trace_sink import MemorySink, NullSink
+from transposition import TranspositionTable
+
+
+class TranspositionTableTest(unittest.TestCase):
+    def test_same_move_and_value_as_plain_search(self):
+        for board in random_boards(5, 4, 8):
+            for depth in range(1, 5):
+                plain = AlphaBetaStrategy('X', depth, sink=NullSink())
+                cached = AlphaBetaStrategy('X', depth, table=TranspositionTable(), sink=NullSink())
+                self.assertEqual(plain.move(board)[1], cached.move(board)[1])
+                self.assertEqual(plain.value, cached.value)
+                self.assertTrue(cached.nodes <= plain.nodes)
+
+    def test_table_is_reused_across_moves(self):
+        table = TranspositionTable()
+        strategy = AlphaBetaStrategy('O', 3, table=table, sink=NullSink())
+        for board in random_boards(6, 3, 8):
+            plain = AlphaBetaStrategy('O', 3, sink=NullSink())
+            self.assertEqual(plain.move(board)[1], strategy.move(board)[1])
+            self.assertEqual(plain.value, strategy.value)
+
+    def test_config_enables_table(self):
+        self.assertTrue(make_strategy('alphabeta:4:tt', 'X').table is not None)
+        self.assertTrue(make_strategy('alphabeta:4', 'X').table is None)
+        self.assertRaises(ValueError, make_strategy, 'pvs:4:tt', 'X')
+
+    def test_game_with_table_matches_plain_game(self):
+        board = random_boards(7, 1, 12)[0]
+        plain = play_game(('b', board, 'alphabeta:3', 'greedy'))
+        cached = play_game(('b', board, 'alphabeta:3:tt', 'greedy'))
+        self.assertEqual(plain['margin'], cached['margin'])
+        self.assertEqual(plain['moves'], cached['moves'])
+
+
+class IterativeDeepeningTest(unittest.TestCase):
+    def assert_same_as_fixed_depth(self, board, player, depth):
+        fixed = AlphaBetaStrategy(player, depth, sink=NullSink())
+        fixed.move(board)
+        timed = AlphaBetaStrategy(player, depth, time_limit=60, sink=NullSink())
+        trace, next_state = timed.move(board)
+        self.assertEqual(fixed.value, timed.value)
+        if timed.best_move is not None:
+            self.assertEqual(fixed.root_scores[timed.best_move], fixed.value)
+
+    def test_ample_budget_matches_fixed_depth(self):
+        for board in random_boards(8, 3, 8):
+            for depth in range(1, 5):
+                self.assert_same_as_fixed_depth(board, 'X', depth)
+
+    def test_depth_beyond_free_cells(self):
+        rng = random.Random(9)
+        for free in range(1, 4):
+            board = random_board(rng, 25 - free)
+            for depth in range(1, free + 3):
+                self.assert_same_as_fixed_depth(board, 'O', depth)
+
+    def assert_single_search_trace(self, trace, depth):
+        root = ('root', 0, float('-inf'), float('-inf'), float('inf'))
+        self.assertEqual(trace[0], root)
+        self.assertEqual(trace.count(root), 1)
+        self.assertEqual(trace[-1][0], 'root')
+        self.assertEqual(max(row[1] for row in trace), depth)
+
+    def test_trace_holds_only_the_deepest_iteration(self):
+        for board in random_boards(15, 2, 8):
+            sink = MemorySink()
+            strategy = AlphaBetaStrategy('X', 3, time_limit=60, sink=sink)
+            trace, next_state = strategy.move(board)
+            self.assertTrue(trace is sink)
+            self.assert_single_search_trace(sink, 3)
+            trace, next_state = AlphaBetaStrategy('X', 3, time_limit=60).move(board)
+            self.assert_single_search_trace(trace, 3)
+
+    def test_trace_drops_the_interrupted_iteration(self):
+        board = random_boards(16, 1, 0)[0]
+        sink = MemorySink()
+        AlphaBetaStrategy('O', 12, time_limit=0.2, sink=sink).move(board)
+        self.assertEqual(len([row for row in sink if row[0] == 'root']), len(board.valid_moves('O')) + 1)
+        self.assert_single_search_trace(sink, max(row[1] for row in sink))
+
+    def test_time_config_bounds_each_move(self):
+        strategy = make_strategy('alphabeta:12:time=0.2', 'X')
+        self.assertEqual(strategy.time_limit, 0.2)
+        board = random_boards(10, 1, 0)[0]
+        start = time.time()
+        trace, next_state = strategy.move(board)
+        self.assertTrue(time.time() - start < 2)
+        self.assertTrue(next_state != board)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+import batch_eval
+from alpha_beta import AlphaBetaStrategy
+from min_max import MinMaxStrategy
+from tournament import make_strategy, random_boards
+from trace_sink import MemorySink
+
+
+class BatchLeavesTest(unittest.TestCase):
+    def test_minimax_trace_unchanged(self):
+        for board in random_boards(11, 3, 8):
+            plain = MinMaxStrategy('X', 2, sink=MemorySink())
+            batched = MinMaxStrategy('X', 2, sink=MemorySink(), batch_leaves=True)
+            plain_trace, plain_state = plain.move(board)
+            batched_trace, batched_state = batched.move(board)
+            self.assertEqual(plain_state, batched_state)
+            self.assertEqual(list(plain_trace), list(batched_trace))
+
+    def test_alpha_beta_trace_unchanged(self):
+        for board in random_boards(12, 3, 8):
+            for depth in (1, 2, 3):
+                plain = AlphaBetaStrategy('O', depth, sink=MemorySink())
+                batched = AlphaBetaStrategy('O', depth, sink=MemorySink(), batch_leaves=True)
+                plain_trace, plain_state = plain.move(board)
+                batched_trace, batched_state = batched.move(board)
+                self.assertEqual(plain_state, batched_state)
+                self.assertEqual(list(plain_trace), list(batched_trace))
+
+    def test_config_enables_batch_leaves(self):
+        self.assertTrue(make_strategy('minimax:2:batch', 'X').batch_leaves)
+        self.assertTrue(make_strategy('alphabeta:3:batch', 'X').batch_leaves)
+        self.assertFalse(make_strategy('alphabeta:3', 'X').batch_leaves)
+
+    @unittest.skipIf(not batch_eval.available(), 'NumPy is not installed')
+    def test_move_scores_match_sneak(self):
+        for board in random_boards(13, 3, 8):
+            scores = batch_eval.move_scores(board, 'X')
+            for move in board.valid_moves('X'):
+                expected = board.sneak(move, 'X').evaluate('X')
+                self.assertEqual(scores[board.geometry.index_of(move)], expected)
+
+    @unittest.skipIf(not batch_eval.available(), 'NumPy is not installed')
+    def test_value_arrays_stay_bounded(self):
+        for board in random_boards(14, batch_eval.VALUE_ARRAYS * 2, 0):
+            batch_eval.move_scores(board, 'O')
+        self.assertTrue(len(batch_eval.value_arrays) <= batch_eval.VALUE_ARRAYS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from board import Board, toggle_player
+from tournament import random_board
+
+
+def rebuilt(board):
+    return Board(board.values, board.x, board.o, size=board.size)
+
+
+def state(board):
+    return board.x, board.o, board.x_score, board.o_score, board.hash
+
+
+def expected_owners(board, location, player):
+    owners = dict((cell.location, cell.player) for cell in board.all_cells())
+    row, column = location
+    neighbors = [cell for cell in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1))
+                 if cell in owners]
+    owners[location] = player
+    if any(owners[cell] == player for cell in neighbors):
+        for cell in neighbors:
+            if owners[cell] == toggle_player(player):
+                owners[cell] = player
+    return owners
+
+
+class MakeUnmakeTest(unittest.TestCase):
+    def test_apply_move_matches_sneak_and_undo_restores(self):
+        rng = random.Random(21)
+        for size in (3, 5, 6):
+            for _ in range(10):
+                board = random_board(rng, rng.randint(0, size * size - 1), size)
+                original = state(board)
+                player = rng.choice('XO')
+                for move in board.valid_moves(player):
+                    sneaked = board.sneak(move, player)
+                    undo = board.apply_move(move, player)
+                    self.assertEqual(state(board), state(sneaked))
+                    self.assertEqual(state(board), state(rebuilt(board)))
+                    board.undo_move(undo)
+                    self.assertEqual(state(board), original)
+
+    def test_sneak_follows_the_raid_rule(self):
+        rng = random.Random(22)
+        for _ in range(20):
+            board = random_board(rng, rng.randint(0, 20))
+            player = rng.choice('XO')
+            for move in board.valid_moves(player):
+                owners = expected_owners(board, move, player)
+                sneaked = board.sneak(move, player)
+                self.assertEqual(dict((cell.location, cell.player) for cell in sneaked.all_cells()), owners)
+
+    def test_game_line_unwinds(self):
+        rng = random.Random(23)
+        board = random_board(rng)
+        start = state(board)
+        undos = []
+        player = 'X'
+        while not board.is_over():
+            undos.append(board.apply_move(rng.choice(board.valid_moves(player)), player))
+            self.assertEqual(state(board), state(rebuilt(board)))
+            player = toggle_player(player)
+        for undo in reversed(undos):
+            board.undo_move(undo)
+        self.assertEqual(state(board), start)
+
+
+if __name__ == '__main__':
+    unittest.main()
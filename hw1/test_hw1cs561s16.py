@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import hw1cs561s16
+import tournament
+from hw1cs561s16 import batch_inputs, read_input, run, run_batch
+from min_max import MinMaxStrategy
+from position_cache import PositionCache
+from trace_sink import FileSink
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, 'hw1cs561s16.py')
+
+
+def sample(name):
+    return read_input(os.path.join(HERE, 'sample', name, 'input.txt'))
+
+
+def read_output(directory, name):
+    with open(os.path.join(directory, name), 'r') as f:
+        return f.read().split()
+
+
+class RecordingSink(FileSink):
+    opened = []
+
+    def __init__(self, file, header):
+        FileSink.__init__(self, file, header)
+        RecordingSink.opened.append(self)
+
+
+class FailingStrategy(MinMaxStrategy):
+    def move(self, board):
+        self.sink.append(('root', 0, 0))
+        raise RuntimeError('search failed')
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.patched = hw1cs561s16.FileSink, tournament.MinMaxStrategy
+        RecordingSink.opened = []
+        hw1cs561s16.FileSink = RecordingSink
+
+    def tearDown(self):
+        hw1cs561s16.FileSink, tournament.MinMaxStrategy = self.patched
+        shutil.rmtree(self.directory)
+
+    def test_traverse_log_closed_when_search_raises(self):
+        tournament.MinMaxStrategy = FailingStrategy
+        lines = read_input(os.path.join(HERE, 'sample', '3', 'input.txt'))
+        self.assertEqual(run_batch([('failing', lines), ('next', lines)], self.directory), ['failing', 'next'])
+        self.assertEqual(len(RecordingSink.opened), 2)
+        for sink in RecordingSink.opened:
+            self.assertTrue(sink.file.closed)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'failing', 'error.txt')))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'failing', 'next_state.txt')))
+
+    def test_traverse_log_written_on_success(self):
+        lines = read_input(os.path.join(HERE, 'sample', '3', 'input.txt'))
+        self.assertEqual(run_batch([('ok', lines)], self.directory), [])
+        self.assertTrue(RecordingSink.opened[0].file.closed)
+        for name in ('next_state.txt', 'traverse_log.txt'):
+            with open(os.path.join(HERE, 'sample', '3', name), 'r') as expected:
+                with open(os.path.join(self.directory, 'ok', name), 'r') as actual:
+                    self.assertEqual(expected.read().split(), actual.read().split())
+
+    def test_jsonl_names_stay_inside_the_batch_directory(self):
+        jsonl = os.path.join(self.directory, 'inputs.jsonl')
+        root = os.path.join(self.directory, 'out')
+        text = ''.join(sample('1'))
+        with open(jsonl, 'w') as f:
+            for name in ('../escaped', '/tmp/absolute', 'a/../../up', 'same', 'same', '..', ''):
+                f.write(json.dumps({'name': name, 'input': text}) + '\n')
+        inputs = list(batch_inputs([], jsonl))
+        self.assertEqual([name for name, lines in inputs], ['escaped', 'tmp_absolute', 'up', 'same', 'same', '5', '6'])
+        self.assertEqual(run_batch(inputs, root), ['same (duplicate name)'])
+        self.assertEqual(sorted(os.listdir(self.directory)), ['inputs.jsonl', 'out'])
+        self.assertEqual(sorted(os.listdir(root)), ['5', '6', 'escaped', 'same', 'tmp_absolute', 'up'])
+
+
+class PositionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = PositionCache(os.path.join(self.directory, 'positions'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def output_dir(self, name):
+        output_dir = os.path.join(self.directory, name)
+        os.makedirs(output_dir)
+        return output_dir
+
+    def test_single_moves_replay_state_and_trace(self):
+        for name, options in (('1', []), ('3', []), ('4', []), ('4', ['tt'])):
+            expected = self.output_dir('%s%s-plain' % (name, ''.join(options)))
+            run(sample(name), expected, options=options)
+            hits = self.cache.hits
+            for n in range(2):
+                output_dir = self.output_dir('%s%s-%d' % (name, ''.join(options), n))
+                run(sample(name), output_dir, cache=self.cache, options=options)
+                for output in os.listdir(expected):
+                    self.assertEqual(read_output(expected, output), read_output(output_dir, output))
+            self.assertEqual(self.cache.hits, hits + 1)
+
+    def test_mcts_single_move_is_cached(self):
+        lines = ['5\n', 'X\n', '1\n'] + sample('3')[3:]
+        expected = run(lines, self.output_dir('plain'))
+        self.assertEqual(run(lines, self.output_dir('first'), cache=self.cache), expected)
+        self.assertEqual(run(lines, self.output_dir('second'), cache=self.cache), expected)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_rejects_searches_it_cannot_replay(self):
+        game = sample('5')
+        game[2] = '5\n'
+        self.assertRaises(ValueError, run, game, self.directory, cache=self.cache)
+        self.assertRaises(ValueError, run, sample('4'), self.directory, cache=self.cache, options=['time=1'])
+        self.assertEqual(run(sample('2'), self.output_dir('timed'), cache=self.cache, options=['time=1']),
+                         run(sample('2'), self.output_dir('plain')))
+
+    def test_command_line_usage_error(self):
+        process = subprocess.Popen([sys.executable, SCRIPT, '-i', os.path.join(HERE, 'sample', '4', 'input.txt'),
+                                    '--cache', os.path.join(self.directory, 'cli'), '--time-limit', '1'],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=self.directory)
+        out, err = process.communicate()
+        self.assertEqual(process.returncode, 2)
+        self.assertTrue('--cache does not apply' in err)
+        self.assertFalse([name for name in os.listdir(self.directory) if name.startswith('cli')])
+
+
+if __name__ == '__main__':
+    unittest.main()
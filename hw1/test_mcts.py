@@ -0,0 +1,59 @@
+import time
+import unittest
+
+from hw1cs561s16 import get_strategy
+from mcts import MCTSStrategy, PLAYOUTS_PER_DEPTH, reward
+from tournament import make_strategy, random_boards
+
+
+class MCTSTest(unittest.TestCase):
+    def test_reward_is_the_result_for_the_mover(self):
+        self.assertEqual(reward(3, 'X'), 1.0)
+        self.assertEqual(reward(3, 'O'), 0.0)
+        self.assertEqual(reward(-1, 'O'), 1.0)
+        self.assertEqual(reward(0, 'X'), 0.5)
+
+    def test_playout_budget(self):
+        board = random_boards(52, 1, 6)[0]
+        strategy = MCTSStrategy('O', 300)
+        strategy.move(board)
+        self.assertEqual(strategy.nodes, 300)
+        self.assertEqual(strategy.root.parent, None)
+        self.assertEqual(MCTSStrategy('O', 300).move(board), MCTSStrategy('O', 300).move(board))
+
+    def test_tree_is_reused_after_the_reply(self):
+        board = random_boards(53, 1, 6)[0]
+        strategy = MCTSStrategy('X', 400)
+        next_state = strategy.move(board)[1]
+        reply = max(strategy.root.children, key=lambda child: child.visits)
+        visits = reply.visits
+        self.assertTrue(visits > 0)
+        strategy.move(next_state.sneak(reply.move, 'O'))
+        self.assertEqual(reply.visits, visits + 400)
+        self.assertTrue(any(child is strategy.root for child in reply.children))
+
+    def test_legal_move_on_nearly_full_board(self):
+        for free in (1, 2, 3):
+            for board in random_boards(54 + free, 3, 25 - free):
+                moves = board.valid_moves('X')
+                next_state = MCTSStrategy('X', 50).move(board)[1]
+                self.assertTrue(any(next_state == board.sneak(move, 'X') for move in moves))
+        full = random_boards(58, 1, 25)[0]
+        self.assertEqual(MCTSStrategy('X', 50).move(full)[1], full)
+
+    def test_time_config_bounds_each_move(self):
+        strategy = make_strategy('mcts:100:time=0.2', 'X')
+        self.assertEqual(strategy.time_limit, 0.2)
+        self.assertEqual(get_strategy('5', 'O', 100, options=['time=0.2', 'tt']).time_limit, 0.2)
+        self.assertTrue(make_strategy('mcts:2', 'X').time_limit is None)
+        self.assertRaises(ValueError, make_strategy, 'mcts:2:tt', 'X')
+        board = random_boards(51, 1)[0]
+        start = time.time()
+        trace, next_state = strategy.move(board)
+        self.assertTrue(time.time() - start < 1)
+        self.assertTrue(next_state != board)
+        self.assertTrue(0 < strategy.nodes < 100 * PLAYOUTS_PER_DEPTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from alpha_beta import AlphaBetaStrategy
+from min_max import MinMaxStrategy
+from parallel import worker_strategy
+from search_stats import SearchStats
+from tournament import make_strategy, play_game, random_boards
+from trace_sink import MemorySink
+
+
+class ParallelSearchTest(unittest.TestCase):
+    def test_minimax_matches_serial(self):
+        parallel = MinMaxStrategy('X', 2, workers=2)
+        try:
+            for board in random_boards(1, 2, 8):
+                parallel.sink = MemorySink()
+                serial = MinMaxStrategy('X', 2, sink=MemorySink())
+                serial_trace, serial_state = serial.move(board)
+                parallel_trace, parallel_state = parallel.move(board)
+                self.assertEqual(serial_state, parallel_state)
+                self.assertEqual(serial.value, parallel.value)
+                self.assertEqual(list(serial_trace), list(parallel_trace))
+        finally:
+            parallel.close()
+
+    def test_alpha_beta_matches_serial(self):
+        parallel = AlphaBetaStrategy('O', 3, workers=3)
+        try:
+            for board in random_boards(2, 3, 8):
+                serial = AlphaBetaStrategy('O', 3)
+                self.assertEqual(serial.move(board)[1], parallel.move(board)[1])
+                self.assertEqual(serial.value, parallel.value)
+        finally:
+            parallel.close()
+
+    def test_alpha_beta_trace_matches_serial(self):
+        parallel = AlphaBetaStrategy('X', 3, workers=3)
+        try:
+            for board in random_boards(5, 2, 8):
+                serial = AlphaBetaStrategy('X', 3, sink=MemorySink())
+                serial_trace, serial_state = serial.move(board)
+                for _ in range(2):
+                    parallel.sink = MemorySink()
+                    parallel_trace, parallel_state = parallel.move(board)
+                    self.assertEqual(serial_state, parallel_state)
+                    self.assertEqual(list(serial_trace), list(parallel_trace))
+                    self.assertEqual(serial.root_scores, parallel.root_scores)
+        finally:
+            parallel.close()
+
+    def test_workers_keep_table_batch_leaves_and_stats(self):
+        for config in ('minimax:2:workers=2:batch', 'alphabeta:3:workers=2:tt:batch'):
+            serial_stats, parallel_stats = SearchStats(), SearchStats()
+            serial = make_strategy(config.replace(':workers=2', ''), 'O', serial_stats)
+            parallel = make_strategy(config, 'O', parallel_stats)
+            try:
+                board = random_boards(6, 1, 8)[0]
+                self.assertEqual(serial.move(board)[1], parallel.move(board)[1])
+            finally:
+                parallel.close()
+            self.assertEqual(serial.value, parallel.value)
+            self.assertEqual(len(parallel_stats.root_moves), len(board.valid_moves('O')))
+            self.assertEqual(parallel_stats.total_nodes(), parallel.nodes)
+            self.assertEqual(sum(root['nodes'] for root in parallel_stats.root_moves), parallel.nodes)
+            if config.startswith('minimax'):
+                self.assertEqual(parallel_stats.nodes, serial_stats.nodes)
+
+    def test_workers_receive_search_settings(self):
+        job = (AlphaBetaStrategy, 'X', 3, {'batch_leaves': True, 'stats': True, 'table': True, 'tracing': False})
+        worker = worker_strategy(job)
+        self.assertTrue(worker.batch_leaves)
+        self.assertTrue(worker.table is not None)
+        self.assertTrue(worker.stats is not None)
+        self.assertFalse(worker.tracing)
+
+    def test_pool_is_kept_across_moves(self):
+        strategy = make_strategy('alphabeta:2:workers=2', 'X')
+        try:
+            board = random_boards(3, 1, 8)[0]
+            strategy.move(board)
+            splitter = strategy.splitter
+            strategy.move(board)
+            self.assertTrue(strategy.splitter is splitter)
+        finally:
+            strategy.close()
+        self.assertTrue(strategy.splitter is None)
+
+    def test_game_matches_serial_game(self):
+        board = random_boards(4, 1, 14)[0]
+        serial = play_game(('b', board, 'alphabeta:2', 'minimax:1'))
+        parallel = play_game(('b', board, 'alphabeta:2:workers=2', 'minimax:1:workers=2'))
+        self.assertEqual(serial['margin'], parallel['margin'])
+        self.assertEqual(serial['moves'], parallel['moves'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from alpha_beta import AlphaBetaStrategy
+from position_cache import CachedStrategy, PositionCache
+from tournament import random_board
+
+
+class PositionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file = os.path.join(self.directory, 'positions')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_bound_holds_before_and_after_reopening(self):
+        cache = PositionCache(self.file, 10)
+        for n in range(25):
+            cache.store('key%d' % n, (n % 5, n / 5), n)
+            self.assertTrue(cache.entries() <= 10)
+        cache.close()
+        cache = PositionCache(self.file, 10)
+        for n in range(25, 40):
+            cache.store('key%d' % n, None, None)
+            self.assertTrue(cache.entries() <= 10)
+        self.assertEqual(cache.lookup('key39'), (None, None, None))
+        self.assertEqual(cache.lookup('key0'), None)
+        cache.close()
+
+    def test_least_recently_used_is_evicted(self):
+        cache = PositionCache(self.file, 10)
+        for n in range(10):
+            cache.store('key%d' % n, (0, n), n)
+        self.assertEqual(cache.lookup('key0'), ((0, 0), 0, None))
+        cache.store('key10', (1, 0), 10)
+        self.assertEqual(cache.lookup('key0'), ((0, 0), 0, None))
+        self.assertEqual(cache.lookup('key1'), None)
+        cache.close()
+
+    def test_cached_strategy_replays_moves(self):
+        cache = PositionCache(self.file, 100)
+        board = random_board(random.Random(41), 6)
+        plain = AlphaBetaStrategy('X', 3)
+        cached = CachedStrategy(AlphaBetaStrategy('X', 3), cache, '3')
+        expected = plain.move(board)[1]
+        self.assertEqual(cached.move(board)[1], expected)
+        nodes = cached.nodes
+        self.assertEqual(cached.move(board)[1], expected)
+        self.assertEqual(cached.nodes, nodes)
+        self.assertEqual(cached.value, plain.value)
+        self.assertEqual(cache.hits, 1)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
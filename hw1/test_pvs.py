@@ -0,0 +1,45 @@
+import random
+import unittest
+
+from board import toggle_player
+from pvs import PVSStrategy
+from tournament import random_board
+
+
+def negamax(board, player, depth):
+    if depth == 0 or board.is_over():
+        return board.evaluate(player)
+    return max(-negamax(board.sneak(move, player), toggle_player(player), depth - 1)
+               for move in board.valid_moves(player))
+
+
+def move_value(board, next_state, player, depth):
+    return -negamax(next_state, toggle_player(player), depth - 1)
+
+
+class PVSTest(unittest.TestCase):
+    def test_exact_on_nearly_filled_boards(self):
+        rng = random.Random(0)
+        for _ in range(60):
+            board = random_board(rng, 13, 4)
+            player = rng.choice('XO')
+            strategy = PVSStrategy(player, 5)
+            trace, next_state = strategy.move(board)
+            exact = negamax(board, player, 5)
+            self.assertEqual(strategy.value, exact)
+            self.assertEqual(move_value(board, next_state, player, 5), exact)
+
+    def test_matches_negamax_at_each_depth(self):
+        rng = random.Random(1)
+        for _ in range(5):
+            board = random_board(rng, 12, 4)
+            for depth in range(1, 4):
+                strategy = PVSStrategy('X', depth)
+                trace, next_state = strategy.move(board)
+                exact = negamax(board, 'X', depth)
+                self.assertEqual(strategy.value, exact)
+                self.assertEqual(move_value(board, next_state, 'X', depth), exact)
+
+
+if __name__ == '__main__':
+    unittest.main()
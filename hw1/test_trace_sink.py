@@ -0,0 +1,58 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from alpha_beta import AlphaBetaStrategy
+from min_max import MinMaxStrategy
+from tournament import random_board
+from trace_sink import ALPHABETA_HEADER, FileSink, MemorySink, MINMAX_HEADER, NullSink, format_row
+
+
+class TraceSinkTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.board = random_board(random.Random(31), 8)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_sinks_match_list(self, make, header):
+        trace, next_state = make(None).move(self.board)
+        rows = list(trace)
+        memory = MemorySink()
+        self.assertEqual(make(memory).move(self.board)[1], next_state)
+        self.assertEqual(list(memory), rows)
+        file = os.path.join(self.directory, 'traverse_log.txt')
+        sink = FileSink(file, header, buffer_rows=7)
+        self.assertEqual(make(sink).move(self.board)[1], next_state)
+        sink.close()
+        with open(file, 'r') as f:
+            self.assertEqual(f.read(), header + ''.join(format_row(row) for row in rows))
+        self.assertEqual(make(NullSink()).move(self.board)[1], next_state)
+
+    def test_minimax_sinks(self):
+        self.assert_sinks_match_list(lambda sink: MinMaxStrategy('X', 2, sink=sink), MINMAX_HEADER)
+
+    def test_alpha_beta_sinks(self):
+        self.assert_sinks_match_list(lambda sink: AlphaBetaStrategy('O', 3, sink=sink), ALPHABETA_HEADER)
+
+    def test_null_sink_skips_rows(self):
+        def location_name(move):
+            raise AssertionError('row built for a null sink')
+
+        for make in (lambda: MinMaxStrategy('X', 2, sink=NullSink(), batch_leaves=True),
+                     lambda: AlphaBetaStrategy('O', 3, sink=NullSink())):
+            board = self.board.clone()
+            board.location_name = location_name
+            strategy = make()
+            self.assertEqual(strategy.move(board)[1], make().move(self.board)[1])
+            self.assertTrue(strategy.nodes > 0)
+
+    def test_infinite_values(self):
+        self.assertEqual(format_row(('root', 0, float('-inf'), float('inf'))), 'root,0,-Infinity,Infinity\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+import argparse
+import csv
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import random
+
+from alpha_beta import AlphaBetaStrategy
+from board import Board, get_board_input
+from game_simulator import GameSimulator
+from greedy import GreedyStrategy
+from mcts import MCTSStrategy, PLAYOUTS_PER_DEPTH
+from min_max import MinMaxStrategy
+from pvs import PVSStrategy
+from trace_sink import NullSink
+from transposition import TranspositionTable
+
+BOARD_OFFSETS = {'1': 3, '2': 3, '3': 3, '4': 7, '5': 3, '6': 3}
+STRATEGY_OPTIONS = {'minimax': ('workers', 'batch'), 'alphabeta': ('tt', 'workers', 'time', 'batch'),
+                    'mcts': ('time',)}
+FIELDS = ['board', 'x', 'o', 'winner', 'margin', 'moves',
+          'x_latency', 'o_latency', 'x_nodes', 'o_nodes']
+
+
+def parse_options(name, options):
+    parsed = {}
+    for option in options:
+        key, _, value = option.partition('=')
+        if key not in STRATEGY_OPTIONS.get(name, ()):
+            raise ValueError('unknown option %s for %s' % (key, name))
+        parsed[key] = value
+    return parsed
+
+
+def applicable_options(name, options):
+    return [option for option in options if option.partition('=')[0] in STRATEGY_OPTIONS.get(name, ())]
+
+
+def option_kwargs(options):
+    kwargs = {}
+    if 'tt' in options:
+        kwargs['table'] = TranspositionTable()
+    if options.get('workers'):
+        kwargs['workers'] = int(options['workers'])
+    if 'batch' in options:
+        kwargs['batch_leaves'] = True
+    if options.get('time'):
+        kwargs['time_limit'] = float(options['time'])
+    return kwargs
+
+
+def close_strategies(strategies):
+    for strategy in strategies:
+        if hasattr(strategy, 'close'):
+            strategy.close()
+
+
+def parse_config(config):
+    parts = config.split(':')
+    name = parts[0]
+    depth = int(parts[1]) if len(parts) > 1 else 1
+    if name not in ('greedy', 'minimax', 'alphabeta', 'mcts', 'pvs'):
+        raise ValueError('unknown strategy %s' % name)
+    return name, depth, parse_options(name, parts[2:])
+
+
+def make_strategy(config, player, stats=None, sink=None):
+    name, depth, options = parse_config(config)
+    if sink is None:
+        sink = NullSink()
+    if name == 'greedy':
+        return GreedyStrategy(player)
+    elif name == 'minimax':
+        return MinMaxStrategy(player, depth, sink=sink, stats=stats, **option_kwargs(options))
+    elif name == 'mcts':
+        return MCTSStrategy(player, depth * PLAYOUTS_PER_DEPTH, **option_kwargs(options))
+    elif name == 'pvs':
+        return PVSStrategy(player, depth, stats=stats)
+    else:
+        return AlphaBetaStrategy(player, depth, sink=sink, stats=stats, **option_kwargs(options))
+
+
+def load_board(file):
+    with open(file, 'r') as fin:
+        lines = fin.readlines()
+    return get_board_input(lines, BOARD_OFFSETS[lines[0].strip()])
+
+
+def random_board(rng, stones=0, size=5):
+    board = Board(tuple(rng.randint(1, 99) for _ in range(size * size)), size=size)
+    for index in rng.sample(range(size * size), stones):
+        board.set_player(divmod(index, size), rng.choice('XO'))
+    return board
+
+
+def random_boards(seed, count, stones=0, size=5):
+    rng = random.Random(seed)
+    return [random_board(rng, stones, size) for _ in range(count)]
+
+
+def average(values):
+    if not values:
+        return 0.0
+    return sum(values) / float(len(values))
+
+
+def play_game(game):
+    name, board, x_config, o_config = game
+    strategies = [make_strategy(x_config, 'X'), make_strategy(o_config, 'O')]
+    simulator = GameSimulator(board, strategies)
+    try:
+        states = simulator.play()
+    finally:
+        close_strategies(strategies)
+    final = states[-1] if states else board
+    margin = final.evaluate('X')
+    if margin == 0:
+        winner = 'draw'
+    else:
+        winner = final.winner()
+    return {'board': name, 'x': x_config, 'o': o_config, 'winner': winner, 'margin': margin,
+            'moves': len(states),
+            'x_latency': average(simulator.move_times[0]), 'o_latency': average(simulator.move_times[1]),
+            'x_nodes': simulator.nodes[0], 'o_nodes': simulator.nodes[1]}
+
+
+def pairings(boards, configs):
+    for name, board in boards:
+        for x_config, o_config in itertools.permutations(configs, 2):
+            yield name, board, x_config, o_config
+
+
+class ResultWriter:
+    def __init__(self, file):
+        self.file = open(file, 'w')
+        self.jsonl = file.endswith('.jsonl')
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.file, FIELDS)
+            self.writer.writeheader()
+
+    def write(self, result):
+        if self.jsonl:
+            self.file.write(json.dumps(result, sort_keys=True) + '\n')
+        else:
+            self.writer.writerow(result)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class Standings:
+    def __init__(self, configs):
+        self.configs = configs
+        self.games = dict((config, 0) for config in configs)
+        self.wins = dict((config, 0) for config in configs)
+        self.latency = dict((config, []) for config in configs)
+        self.nodes = dict((config, 0) for config in configs)
+
+    def record(self, result):
+        for side in ('x', 'o'):
+            config = result[side]
+            self.games[config] += 1
+            self.latency[config].append(result[side + '_latency'])
+            self.nodes[config] += result[side + '_nodes']
+            if result['winner'] == side.upper():
+                self.wins[config] += 1
+
+    def summary(self):
+        lines = ['%-16s %6s %8s %12s %12s' % ('strategy', 'games', 'win rate', 'latency(ms)', 'nodes')]
+        for config in self.configs:
+            games = self.games[config]
+            lines.append('%-16s %6d %8.3f %12.3f %12d' % (
+                config, games, self.wins[config] / float(max(games, 1)),
+                average(self.latency[config]) * 1000, self.nodes[config]))
+        return '\n'.join(lines)
+
+
+def run_tournament(boards, configs, output, workers=None):
+    standings = Standings(configs)
+    writer = ResultWriter(output)
+    pool = None
+    # strategies with their own worker pool cannot run inside the (daemonic) game pool
+    if not any(parse_config(config)[2].get('workers') for config in configs):
+        pool = multiprocessing.Pool(workers)
+    try:
+        games = itertools.imap if pool is None else pool.imap
+        for result in games(play_game, pairings(boards, configs)):
+            writer.write(result)
+            standings.record(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        writer.close()
+    return standings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play every pairing of strategies on a set of boards.')
+    parser.add_argument('--strategies', nargs='+', required=True,
+                        help='e.g. greedy minimax:2:workers=4 alphabeta:4:tt alphabeta:8:time=0.5 mcts:4:time=1 pvs:5')
+    parser.add_argument('--boards', nargs='*', default=[], help='input.txt files to take boards from')
+    parser.add_argument('--random', type=int, default=0, help='number of random boards to add')
+    parser.add_argument('--stones', type=int, default=0, help='stones pre-placed on random boards')
+    parser.add_argument('--size', type=int, default=5, help='side length of random boards')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='tournament.csv', help='.csv or .jsonl')
+    args = parser.parse_args()
+
+    for config in args.strategies:
+        parse_config(config)
+    files = sorted(itertools.chain.from_iterable(glob.glob(pattern) for pattern in args.boards))
+    boards = [(os.path.relpath(file), load_board(file)) for file in files]
+    boards += [('random-%d' % n, board)
+               for n, board in enumerate(random_boards(args.seed, args.random, args.stones, args.size))]
+    print run_tournament(boards, args.strategies, args.output, args.workers).summary()
+
+
+if __name__ == '__main__':
+    main()
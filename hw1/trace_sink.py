@@ -0,0 +1,63 @@
+MINMAX_HEADER = 'Node,Depth,Value\n'
+ALPHABETA_HEADER = 'Node,Depth,Value,Alpha,Beta\n'
+BUFFER_ROWS = 4096
+
+
+def transform_inf(value):
+    if value == float('-inf'):
+        return '-Infinity'
+    elif value == float('inf'):
+        return 'Infinity'
+    else:
+        return value
+
+
+def format_row(row):
+    return ','.join(str(transform_inf(value)) for value in row) + '\n'
+
+
+class FileSink:
+    def __init__(self, file, header, buffer_rows=BUFFER_ROWS):
+        self.file = open(file, 'w')
+        self.file.write(header)
+        self.buffer = []
+        self.buffer_rows = buffer_rows
+
+    def append(self, row):
+        self.buffer.append(format_row(row))
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def flush(self):
+        self.file.write(''.join(self.buffer))
+        del self.buffer[:]
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class NullSink:
+    def append(self, row):
+        pass
+
+    def extend(self, rows):
+        pass
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+
+class MemorySink(list):
+    def close(self):
+        pass
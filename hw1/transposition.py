@@ -0,0 +1,54 @@
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+DEPTH_PREFERRED = 'depth'
+ALWAYS_REPLACE = 'always'
+
+
+class TranspositionTable:
+    def __init__(self, size=1 << 16, replacement=DEPTH_PREFERRED):
+        self.size = size
+        self.replacement = replacement
+        self.values = None
+        self.generation = 0
+        self.hits = 0
+        self.clear()
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+    def new_search(self, values):
+        if values != self.values:
+            self.values = values
+            self.clear()
+        self.generation += 1
+
+    def probe(self, key):
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def lookup(self, key, depth, alpha, beta):
+        entry = self.probe(key)
+        if entry is None or entry[1] < depth:
+            return None
+        value = entry[3]
+        if entry[2] == EXACT or (entry[2] == LOWER and value >= beta) or (entry[2] == UPPER and value <= alpha):
+            self.hits += 1
+            return value
+        return None
+
+    def store(self, key, depth, alpha, beta, value, move=None):
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        slot = key % self.size
+        entry = self.entries[slot]
+        if entry is None or entry[0] == key or self.replacement == ALWAYS_REPLACE \
+                or entry[5] != self.generation or depth >= entry[1]:
+            self.entries[slot] = (key, depth, bound, value, move, self.generation)
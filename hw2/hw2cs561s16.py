@@ -1,32 +1,101 @@
+import argparse
+import gc
+import heapq
+import marshal
+import os
 import re
+import socket
+import stat
 import sys
-from copy import deepcopy
 from itertools import chain, imap
 
 
+LOG_OFF = 'off'
+LOG_SUMMARY = 'summary'
+LOG_FULL = 'full'
+BUFFER_LINES = 4096
+
+
 class Logger:
-    def __init__(self):
+    def __init__(self, file=None, level=LOG_FULL, echo=True, buffer_lines=BUFFER_LINES):
+        self.level = level
+        self.echo = echo
         self.output = []
-
-    def log(self, line):
-        if len(self.output) == 0:
-            self.output.append(line)
+        self.file = open(file, 'w') if file is not None else None
+        self.buffer = []
+        self.buffer_lines = buffer_lines
+        self.last = None
+        self.counts = {}
+
+    def log(self, sentence, prefix):
+        if self.level == LOG_OFF:
+            return
+        line = stringify(sentence, prefix)
+        if line == self.last:
+            return
+        self.last = line
+        self.counts[prefix] = self.counts.get(prefix, 0) + 1
+        if self.level != LOG_FULL:
+            return
+        if self.echo:
             print line
-        elif self.output[-1] != line:
+        if self.file is None:
             self.output.append(line)
-            print line
+        else:
+            self.buffer.append(line + '\n')
+            if len(self.buffer) >= self.buffer_lines:
+                self.flush()
+
+    def flush(self):
+        self.file.write(''.join(self.buffer))
+        del self.buffer[:]
+
+    def summary(self):
+        return '%d asked, %d true, %d false' % (self.counts.get('Ask', 0), self.counts.get(str(True), 0),
+                                                self.counts.get(str(False), 0))
+
+    def close(self, last_line=''):
+        if self.file is not None:
+            self.flush()
+            self.file.write(last_line)
+            self.file.close()
 
 
 def flatmap(f, items):
     return list(chain.from_iterable(imap(f, items)))
 
 
+class SymbolTable:
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = len(self.names) << 1 | (1 if name[:1].isupper() else 0)
+            self.ids[name] = symbol
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol):
+        return self.names[symbol >> 1]
+
+    def extends(self, names):
+        return self.names == names[:len(self.names)]
+
+
+symbols = SymbolTable()
+RENAME_SHIFT = 32
+QUERY_TAG = 1 << 16
+
+
 def is_constant(variable):
-    return variable[0].isupper()
+    return variable & 1 == 1
 
 
 def is_variable(variable):
-    return not is_constant(variable)
+    return variable & 1 == 0
 
 
 IMPLICATION = '=>'
@@ -38,10 +107,10 @@ def strip(search):
 
 def stringify(sentence, prefix):
     result = prefix + ": "
-    result += sentence.predicate + "("
+    result += symbols.name(sentence.predicate) + "("
     for j, variable in enumerate(sentence.variables):
         if is_constant(variable):
-            result += variable
+            result += symbols.name(variable)
         else:
             result += "_"
         if j != len(sentence.variables) - 1:
@@ -51,19 +120,57 @@ def stringify(sentence, prefix):
     return result
 
 
-class Sentence:
-    def __init__(self, s):
+def variant(sentence):
+    names = []
+    arguments = []
+    for variable in sentence.variables:
+        if is_constant(variable):
+            arguments.append(variable)
+        else:
+            if variable not in names:
+                names.append(variable)
+            arguments.append(-1 - names.index(variable))
+    return (sentence.negated, sentence.predicate, tuple(arguments)), names
+
+
+def answer_of(sentence, names):
+    return tuple(-1 - names.index(variable) if variable in names else variable for variable in sentence.variables)
+
+
+def instantiate(goal, names, answer):
+    return goal.with_variables(tuple(names[-1 - argument] if argument < 0 else argument for argument in answer))
+
+
+class Sentence(object):
+    __slots__ = ('s', 'negated', 'predicate', 'variables')
+
+    def __init__(self, s, negated=False, predicate=None, variables=None):
         self.s = s
+        if predicate is not None:
+            self.negated = negated
+            self.predicate = predicate
+            self.variables = variables
+            return
         search = re.search(r'(~?)(.*?)\((.*)\)', s)
+        if search is None:
+            raise ValueError('not a sentence: %s' % s)
         if search.group(1) != '':
             self.negated = True
         else:
             self.negated = False
-        self.predicate = search.group(2)
-        self.variables = strip(search.group(3).split(','))
+        self.predicate = symbols.intern(search.group(2))
+        self.variables = tuple(symbols.intern(variable) for variable in strip(search.group(3).split(',')))
+
+    def with_variables(self, variables):
+        if variables == self.variables:
+            return self
+        return Sentence(None, self.negated, self.predicate, variables)
+
+    def substitute(self, theta):
+        return self.with_variables(tuple(theta.get(variable, variable) for variable in self.variables))
 
     def __str__(self):
-        return self.predicate + "(" + ','.join(self.variables) + ")"
+        return symbols.name(self.predicate) + "(" + ','.join(map(symbols.name, self.variables)) + ")"
 
     def has_variables(self):
         return len(self.variables) - len(self.constants()) > 0
@@ -72,10 +179,10 @@ class Sentence:
         return filter(is_constant, self.variables)
 
     def is_fact(self):
-        return len(self.predicate) == 0
+        return len(symbols.name(self.predicate)) == 0
 
     def copy(self):
-        return deepcopy(self)
+        return self
 
     def are_variables_different(self, other):
         return len(self.variables) == len(other.variables) and self.variables != other.variables
@@ -97,19 +204,52 @@ class KnowledgeBase:
     def __init__(self):
         self.knowledges = []
         self.constants = []
+        self.constant_set = set()
         self.random_variables = 0
+        self.by_predicate = {}
+        self.by_constant = {}
+        self.by_variable = {}
+        self.observers = []
 
     def add_knowledge(self, knowledge):
+        index = len(self.knowledges)
         self.knowledges.append(knowledge)
-        new_constants = knowledge.constants()
-        self.constants += filter(lambda x: x not in self.constants, new_constants)
+        conclusion = knowledge.conclusion
+        self.by_predicate.setdefault(conclusion.predicate, []).append(index)
+        for i, variable in enumerate(conclusion.variables):
+            if is_constant(variable):
+                self.by_constant.setdefault((conclusion.predicate, i, variable), []).append(index)
+            else:
+                self.by_variable.setdefault((conclusion.predicate, i), []).append(index)
+        new_constants = [variable for variable in knowledge.constants() if variable not in self.constant_set]
+        self.constants += new_constants
+        self.constant_set.update(new_constants)
+        for observer in self.observers:
+            observer.add_knowledge(knowledge)
+
+    def candidates(self, query):
+        predicate = query.predicate
+        indexes = self.by_predicate.get(predicate, [])
+        smallest, position = len(indexes), None
+        for i, variable in enumerate(query.variables):
+            if is_constant(variable):
+                size = len(self.by_constant.get((predicate, i, variable), [])) + \
+                       len(self.by_variable.get((predicate, i), []))
+                if size < smallest:
+                    smallest, position = size, (i, variable)
+        if position is None:
+            return indexes
+        i, variable = position
+        return heapq.merge(self.by_constant.get((predicate, i, variable), []),
+                           self.by_variable.get((predicate, i), []))
 
     def fetch_rules(self, query):
         goals = []
-        for knowledge in self.knowledges:
+        for index in self.candidates(query):
+            knowledge = self.knowledges[index]
             if self.can_unify(knowledge, query):
                 goals.append(knowledge)
-        return deepcopy(goals)
+        return goals
 
     def can_unify(self, knowledge, query):
         if knowledge.conclusion.predicate == query.predicate:
@@ -124,19 +264,25 @@ class KnowledgeBase:
 
     def generate_variable(self):
         self.random_variables += 1
-        return "a" + str(self.random_variables)
+        return symbols.intern("a" + str(self.random_variables))
 
 
-class Knowledge:
-    def __init__(self, knowledge):
+class Knowledge(object):
+    __slots__ = ('knowledge', 'premise', 'conclusion')
+
+    def __init__(self, knowledge, premise=None, conclusion=None):
         self.knowledge = knowledge
+        if conclusion is not None:
+            self.premise = premise
+            self.conclusion = conclusion
+            return
         parts = knowledge.split(IMPLICATION)
         parts = map(lambda x: x.strip(), parts)
         if len(parts) == 2:
-            self.premise = to_sentences(parts[0])
+            self.premise = tuple(to_sentences(parts[0]))
             self.conclusion = Sentence(parts[1])
         else:
-            self.premise = []
+            self.premise = ()
             self.conclusion = Sentence(parts[0])
 
     def __str__(self):
@@ -157,41 +303,202 @@ class Knowledge:
         return flatmap(lambda x: x.constants(), self.all_sentences())
 
 
+KB_MAGIC = 'hw2kb'
+KB_VERSION = 1
+
+
+def sentence_tuple(sentence):
+    return sentence.negated, sentence.predicate, sentence.variables
+
+
+def clause_knowledge(clause, translate=None):
+    premise, conclusion = clause
+    if translate is not None:
+        premise = tuple((negated, translate(predicate), tuple(imap(translate, variables)))
+                        for negated, predicate, variables in premise)
+        negated, predicate, variables = conclusion
+        conclusion = negated, translate(predicate), tuple(imap(translate, variables))
+    return Knowledge(None, tuple(Sentence(None, *sentence) for sentence in premise), Sentence(None, *conclusion))
+
+
+class CompiledClauses:
+    def __init__(self, clauses):
+        self.clauses = clauses
+        self.knowledges = [None] * len(clauses)
+
+    def __len__(self):
+        return len(self.knowledges)
+
+    def __getitem__(self, index):
+        knowledge = self.knowledges[index]
+        if knowledge is None:
+            knowledge = self.knowledges[index] = clause_knowledge(self.clauses[index])
+        return knowledge
+
+    def __iter__(self):
+        for index in xrange(len(self.knowledges)):
+            yield self[index]
+
+    def append(self, knowledge):
+        self.clauses.append(None)
+        self.knowledges.append(knowledge)
+
+
+def compile_kb(kb, file):
+    clauses = [(tuple(imap(sentence_tuple, knowledge.premise)), sentence_tuple(knowledge.conclusion))
+               for knowledge in kb.knowledges]
+    with open(file, 'wb') as f:
+        marshal.dump((KB_MAGIC, KB_VERSION, symbols.names, symbols.ids, clauses, kb.constants,
+                      kb.by_predicate, kb.by_constant, kb.by_variable), f, 2)
+
+
+def load_kb(file):
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(file, 'rb') as f:
+            compiled = marshal.load(f)
+        if compiled[:2] != (KB_MAGIC, KB_VERSION):
+            raise ValueError('not a compiled knowledge base: %s' % file)
+        names, ids, clauses, constants, by_predicate, by_constant, by_variable = compiled[2:]
+        kb = KnowledgeBase()
+        if not symbols.extends(names):
+            translate = [symbols.intern(name) for name in names]
+            for clause in clauses:
+                kb.add_knowledge(clause_knowledge(clause, lambda symbol: translate[symbol >> 1]))
+            return kb
+        symbols.names[len(symbols.names):] = names[len(symbols.names):]
+        symbols.ids.update(ids)
+        kb.knowledges = CompiledClauses(clauses)
+        kb.constants = constants
+        kb.constant_set = set(constants)
+        kb.by_predicate = by_predicate
+        kb.by_constant = by_constant
+        kb.by_variable = by_variable
+        return kb
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class Table:
+    def __init__(self):
+        self.answers = []
+        self.seen = set()
+        self.complete = False
+        self.evaluating = False
+        self.pending = False
+        self.depth = 0
+        self.low = 0
+
+    def add(self, answer):
+        if answer in self.seen:
+            return False
+        self.seen.add(answer)
+        self.answers.append(answer)
+        return True
+
+
 class InferenceResolver:
-    def __init__(self, knowledge_base):
+    def __init__(self, knowledge_base, tabling=False, logger=None):
         self.kb = knowledge_base
-        self.logger = Logger()
+        self.logger = logger if logger is not None else Logger()
         self.random_variables = 0
+        self.tables = {} if tabling else None
+        self.stack = []
+        self.incomplete = []
+        self.added = 0
+        if tabling:
+            knowledge_base.observers.append(self)
+
+    def add_knowledge(self, knowledge):
+        self.reset()
 
     def resolve(self, queries):
-        for query in queries:
-            if not self.validate(query):
-                return False
-        return True
+        try:
+            for query in queries:
+                if not self.validate(query):
+                    return False
+            return True
+        except Exception:
+            self.reset()
+            raise
+
+    def reset(self):
+        if self.tables is not None:
+            self.tables = {}
+        del self.stack[:]
+        del self.incomplete[:]
 
     def validate(self, query):
         for unified_result_query in self.fol_or(query):
             if unified_result_query is None:
-                self.logger.log(stringify(query, str(False)))
+                self.logger.log(query, str(False))
                 return False
             else:
-                self.logger.log(stringify(unified_result_query, str(True)))
+                self.logger.log(unified_result_query, str(True))
                 return True
 
-        self.logger.log(stringify(query, str(False)))
+        self.logger.log(query, str(False))
         return False
 
     def fol_or(self, goal):
+        if self.tables is not None:
+            return self.tabled_or(goal)
+        return self.expand_or(goal)
+
+    def tabled_or(self, goal):
+        key, names = variant(goal)
+        answers = self.solve(goal, key, names)
+        if len(answers) == 0:
+            self.logger.log(goal, "Ask")
+            return [None]
+        return [instantiate(goal, names, answer) for answer in answers]
+
+    def solve(self, goal, key, names):
+        table = self.tables.get(key)
+        if table is not None and (table.complete or table.evaluating):
+            if not table.complete:
+                for frame in self.stack[table.depth + 1:]:
+                    frame.low = min(frame.low, table.depth)
+            return list(table.answers)
+        if table is None:
+            table = self.tables[key] = Table()
+        table.depth = table.low = len(self.stack)
+        table.evaluating = True
+        self.stack.append(table)
+        marker = len(self.incomplete)
+        while True:
+            added = self.added
+            for answer in self.expand_or(goal):
+                if answer is not None and table.add(answer_of(answer, names)):
+                    self.added += 1
+            if table.low < table.depth or self.added == added:
+                break
+        self.stack.pop()
+        table.evaluating = False
+        if table.low < table.depth:
+            if not table.pending:
+                table.pending = True
+                self.incomplete.append(table)
+        else:
+            for member in self.incomplete[marker:]:
+                member.complete = True
+            del self.incomplete[marker:]
+            table.complete = True
+        return list(table.answers)
+
+    def expand_or(self, goal):
         rules = self.kb.fetch_rules(goal)
         if len(rules) == 0:
-            self.logger.log(stringify(goal, "Ask"))
+            self.logger.log(goal, "Ask")
             yield None
 
         for rule in rules:
-            self.logger.log(stringify(goal, "Ask"))
+            self.logger.log(goal, "Ask")
             if len(rule.premise) == 0:
                 scope = {}
-                goal_copy = goal.copy()
+                goal_copy = goal
                 valid = True
                 if rule.conclusion.are_variables_different(goal):
                     for i, conclusion_variable in enumerate(rule.conclusion.variables):
@@ -203,18 +510,15 @@ class InferenceResolver:
                     if not valid:
                         continue
 
-                    for i, variables in enumerate(goal_copy.variables):
-                        if goal_copy.variables[i] in scope:
-                            goal_copy.variables[i] = scope[goal.variables[i]]
+                    goal_copy = goal.substitute(scope)
                 yield goal_copy
             else:
                 unified_goal, unified_rule = self.unify(goal, rule)
                 for scope2 in self.fol_and(unified_rule.premise):
                     if scope2 is not None:
-                        rule_copy = deepcopy(unified_rule)
-                        rule_copy.conclusion = self.substitute(rule_copy.conclusion, scope2)
-                        if unified_goal.unifiable_variables(rule_copy.conclusion):
-                            yield self.rewrite_query(rule_copy.conclusion, unified_goal)
+                        conclusion = self.substitute(unified_rule.conclusion, scope2)
+                        if unified_goal.unifiable_variables(conclusion):
+                            yield self.rewrite_query(conclusion, unified_goal)
                     else:
                         break
 
@@ -224,15 +528,14 @@ class InferenceResolver:
         else:
             scope = {}
             first, rest = goals[0], goals[1:]
-            for result_query in self.fol_or(deepcopy(first)):
+            for result_query in self.fol_or(first):
                 if result_query is None:
-                    self.logger.log(stringify(first, "False"))
+                    self.logger.log(first, "False")
                     yield None
                     return
                 else:
-                    self.logger.log(stringify(result_query, "True"))
-                    rest_copy = deepcopy(rest)
-                    _scope = self.substitute_premise(rest_copy, first, result_query)
+                    self.logger.log(result_query, "True")
+                    rest_copy, _scope = self.substitute_premise(rest, first, result_query)
                     scope.update(_scope)
                     for __scope in self.fol_and(rest_copy):
                         if __scope is not None and len(__scope) > 0:
@@ -243,35 +546,28 @@ class InferenceResolver:
             yield None
 
     def unify(self, goal, rule):
-        goal, rule = deepcopy(goal), deepcopy(rule)
         scope = {}
+        conclusion_variables = list(rule.conclusion.variables)
         for i, goal_variable in enumerate(goal.variables):
-            rule_variable = rule.conclusion.variables[i]
+            rule_variable = conclusion_variables[i]
             if is_constant(goal_variable) and is_variable(rule_variable):
                 scope[rule_variable] = goal_variable
-                rule.conclusion.variables[i] = goal_variable
+                conclusion_variables[i] = goal_variable
 
-        for premise in rule.premise:
-            for i, pred_variable in enumerate(premise.variables):
-                if pred_variable in scope:
-                    premise.variables[i] = scope[pred_variable]
-
-        return goal, rule
+        premise = tuple(premise.substitute(scope) for premise in rule.premise)
+        conclusion = rule.conclusion.with_variables(tuple(conclusion_variables))
+        return goal, Knowledge(rule.knowledge, premise, conclusion)
 
     def substitute(self, sentence, theta):
-        substituted_sentence = deepcopy(sentence)
-        for i, variable in enumerate(sentence.variables):
-            if variable in theta:
-                substituted_sentence.variables[i] = theta[variable]
-        return substituted_sentence
+        return sentence.substitute(theta)
 
     def rewrite_query(self, conclusion, goal):
-        goal = goal.copy()
+        variables = list(goal.variables)
         for i, query_variable in enumerate(goal.variables):
             conclusion_variable = conclusion.variables[i]
             if is_variable(query_variable) and is_constant(conclusion_variable):
-                goal.variables[i] = conclusion_variable
-        return goal
+                variables[i] = conclusion_variable
+        return goal.with_variables(tuple(variables))
 
     def substitute_premise(self, rest, first, query):
         scope = {}
@@ -281,26 +577,269 @@ class InferenceResolver:
             if is_variable(var) and is_constant(query_var):
                 scope[var] = query_var
 
-        for premise in rest:
-            for i, premise_variable in enumerate(premise.variables):
-                if premise_variable in scope:
-                    premise.variables[i] = scope[premise_variable]
-
-        return scope
-
-
-input_file = sys.argv[2]
-output_file = "output.txt"
-kb = KnowledgeBase()
-with open(input_file, 'r') as fin:
-    query = to_sentences(fin.readline())
-    for _ in range(int(fin.readline().strip())):
-        kb.add_knowledge(Knowledge(fin.readline()))
-
-resolver = InferenceResolver(kb)
-answer = resolver.resolve(query)
-with open(output_file, 'w') as f:
-    f.truncate()
-    for line in resolver.logger.output:
-        f.writelines(line + '\n')
-    f.writelines(str(answer))
+        return [premise.substitute(scope) for premise in rest], scope
+
+
+def standardize(arguments):
+    names = []
+    standardized = []
+    for argument in arguments:
+        if is_variable(argument):
+            if argument not in names:
+                names.append(argument)
+            argument = symbols.intern('_%d' % names.index(argument))
+        standardized.append(argument)
+    return tuple(standardized)
+
+
+def rename(arguments, tag):
+    return tuple(argument + (tag << RENAME_SHIFT) if is_variable(argument) else argument for argument in arguments)
+
+
+def walk(argument, bindings):
+    while is_variable(argument) and argument in bindings:
+        argument = bindings[argument]
+    return argument
+
+
+def unify_arguments(pattern, arguments, bindings):
+    if len(pattern) != len(arguments):
+        return None
+    bindings = dict(bindings)
+    for this, that in zip(pattern, arguments):
+        this, that = walk(this, bindings), walk(that, bindings)
+        if this == that:
+            continue
+        if is_variable(this):
+            bindings[this] = that
+        elif is_variable(that):
+            bindings[that] = this
+        else:
+            return None
+    return bindings
+
+
+# Forward chaining unifies whole atoms: a variable fact such as E(x) holds for every constant, and a
+# variable that occurs only in a conclusion stays a variable, so P1(A, y) => P2(z, z) gives P2(x, x) and
+# never P2(A, C). InferenceResolver keeps its positional substitution, so the two engines can answer
+# differently on such knowledge bases.
+class Materializer:
+    def __init__(self, knowledge_base):
+        self.kb = knowledge_base
+        self.facts = set()
+        self.by_predicate = {}
+        self.by_constant = {}
+        self.by_variable = {}
+        self.by_premise = {}
+        for knowledge in knowledge_base.knowledges:
+            self.add_knowledge(knowledge)
+        knowledge_base.observers.append(self)
+
+    def add_knowledge(self, knowledge):
+        conclusion = (knowledge.conclusion.predicate, knowledge.conclusion.variables)
+        if len(knowledge.premise) == 0:
+            delta = self.insert(conclusion)
+        else:
+            premise = tuple((sentence.predicate, sentence.variables) for sentence in knowledge.premise)
+            rule = (premise, conclusion)
+            for i, (predicate, arguments) in enumerate(premise):
+                self.by_premise.setdefault(predicate, []).append((rule, i))
+            delta = []
+            for bindings in self.join(premise, 0, None, {}):
+                delta += self.insert(self.conclude(conclusion, bindings))
+        self.saturate(delta)
+
+    def insert(self, atom):
+        atom = (atom[0], standardize(atom[1]))
+        if atom in self.facts:
+            return []
+        self.facts.add(atom)
+        predicate, arguments = atom
+        self.by_predicate.setdefault(predicate, []).append(atom)
+        for i, argument in enumerate(arguments):
+            if is_constant(argument):
+                self.by_constant.setdefault((predicate, i, argument), []).append(atom)
+            else:
+                self.by_variable.setdefault((predicate, i), []).append(atom)
+        return [atom]
+
+    def saturate(self, delta):
+        while len(delta) > 0:
+            derived = []
+            for atom in delta:
+                for (premise, conclusion), position in self.by_premise.get(atom[0], []):
+                    bindings = unify_arguments(premise[position][1], rename(atom[1], position + 1), {})
+                    if bindings is None:
+                        continue
+                    for joined in self.join(premise, 0, position, bindings):
+                        derived += self.insert(self.conclude(conclusion, joined))
+            delta = derived
+
+    def join(self, premise, i, skip, bindings):
+        if i == len(premise):
+            yield bindings
+            return
+        if i == skip:
+            for joined in self.join(premise, i + 1, skip, bindings):
+                yield joined
+            return
+        predicate, pattern = premise[i]
+        pattern = tuple(walk(argument, bindings) for argument in pattern)
+        for atom in self.lookup(predicate, pattern):
+            unified = unify_arguments(pattern, rename(atom[1], i + 1), bindings)
+            if unified is not None:
+                for joined in self.join(premise, i + 1, skip, unified):
+                    yield joined
+
+    def conclude(self, conclusion, bindings):
+        return conclusion[0], tuple(walk(argument, bindings) for argument in conclusion[1])
+
+    def lookup(self, predicate, pattern):
+        atoms = self.by_predicate.get(predicate, [])
+        smallest, position = len(atoms), None
+        for i, argument in enumerate(pattern):
+            if is_constant(argument):
+                size = len(self.by_constant.get((predicate, i, argument), [])) + \
+                       len(self.by_variable.get((predicate, i), []))
+                if size < smallest:
+                    smallest, position = size, (i, argument)
+        if position is None:
+            return atoms
+        i, argument = position
+        return chain(self.by_constant.get((predicate, i, argument), []), self.by_variable.get((predicate, i), []))
+
+    def holds(self, sentence):
+        if (sentence.predicate, sentence.variables) in self.facts:
+            return True
+        for atom in self.lookup(sentence.predicate, sentence.variables):
+            if unify_arguments(sentence.variables, rename(atom[1], QUERY_TAG), {}) is not None:
+                return True
+        return False
+
+    def resolve(self, queries):
+        for query in queries:
+            if not self.holds(query):
+                return False
+        return True
+
+
+class QueryServer:
+    def __init__(self, knowledge_base, tabling=False, forward=False, proof_dir=None):
+        self.kb = knowledge_base
+        self.forward = forward
+        self.proof_dir = proof_dir
+        self.queries = 0
+        if forward:
+            self.engine = Materializer(knowledge_base)
+        else:
+            self.engine = InferenceResolver(knowledge_base, tabling, Logger(level=LOG_OFF))
+
+    def handle(self, line):
+        line = line.strip()
+        if len(line) == 0:
+            return None
+        if line.startswith('tell '):
+            self.kb.add_knowledge(Knowledge(line[len('tell '):].strip()))
+            return 'ok'
+        if line.startswith('ask '):
+            line = line[len('ask '):]
+        query = to_sentences(line)
+        self.queries += 1
+        if self.forward:
+            return str(self.engine.resolve(query))
+        if self.proof_dir is not None:
+            logger = Logger(os.path.join(self.proof_dir, 'query-%d.txt' % self.queries), echo=False)
+        else:
+            logger = Logger(level=LOG_OFF)
+        self.engine.logger = logger
+        answer = 'error'
+        try:
+            answer = str(self.engine.resolve(query))
+        finally:
+            logger.close(answer)
+        return answer
+
+    def serve(self, reader, writer):
+        for line in iter(reader.readline, ''):
+            try:
+                response = self.handle(line)
+            except Exception as e:
+                response = 'error: %s' % e
+            if response is not None:
+                writer.write(response + '\n')
+                writer.flush()
+
+
+def serve_socket(server, path):
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.remove(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    try:
+        while True:
+            connection, _ = listener.accept()
+            reader, writer = connection.makefile('r'), connection.makefile('w')
+            try:
+                server.serve(reader, writer)
+            finally:
+                reader.close()
+                writer.close()
+                connection.close()
+    finally:
+        listener.close()
+        os.remove(path)
+
+
+def read_input(file, kb=None):
+    if kb is None:
+        kb = KnowledgeBase()
+    with open(file, 'r') as fin:
+        query = to_sentences(fin.readline())
+        for _ in range(int(fin.readline().strip())):
+            kb.add_knowledge(Knowledge(fin.readline()))
+    return query, kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Answer a hw2 query against its knowledge base.')
+    parser.add_argument('-i', dest='input', required=True, help='input file, the proof goes to output.txt')
+    parser.add_argument('--tabling', action='store_true', help='memoize subgoal answers so recursive rules terminate')
+    parser.add_argument('--forward', action='store_true', help='answer by forward chaining to a fixpoint')
+    parser.add_argument('--log', choices=(LOG_OFF, LOG_SUMMARY, LOG_FULL), default=LOG_FULL)
+    parser.add_argument('--quiet', action='store_true', help='do not echo the proof to stdout')
+    parser.add_argument('--serve', action='store_true', help='answer tell/ask lines from stdin')
+    parser.add_argument('--socket', metavar='PATH', help='answer tell/ask lines on a unix socket')
+    parser.add_argument('--proofs', metavar='DIR', help='in server mode, write each proof to DIR/query-N.txt')
+    parser.add_argument('--kb', help='load a knowledge base written by --compile before reading the input')
+    parser.add_argument('--compile', metavar='OUT', help='write the knowledge base to OUT and exit')
+    args = parser.parse_args()
+
+    query, kb = read_input(args.input, load_kb(args.kb) if args.kb else None)
+    if args.compile:
+        compile_kb(kb, args.compile)
+        return
+    if args.serve or args.socket:
+        server = QueryServer(kb, args.tabling, args.forward, args.proofs)
+        if args.socket:
+            serve_socket(server, args.socket)
+        else:
+            server.serve(sys.stdin, sys.stdout)
+        return
+
+    output_file = "output.txt"
+    logger = Logger(output_file, args.log, echo=not args.quiet)
+    answer = 'error'
+    try:
+        if args.forward:
+            answer = str(Materializer(kb).resolve(query))
+        else:
+            answer = str(InferenceResolver(kb, tabling=args.tabling, logger=logger).resolve(query))
+    finally:
+        logger.close(answer)
+    if logger.level == LOG_SUMMARY:
+        print logger.summary()
+
+
+if __name__ == '__main__':
+    main()
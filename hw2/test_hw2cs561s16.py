@@ -0,0 +1,318 @@
+import glob
+import marshal
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from StringIO import StringIO
+
+from hw2cs561s16 import compile_kb, InferenceResolver, Knowledge, KnowledgeBase, load_kb, Logger, LOG_FULL, LOG_OFF, \
+    LOG_SUMMARY, Materializer, QueryServer, read_input, serve_socket, symbols, to_sentences
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, 'hw2cs561s16.py')
+POSITIONAL_ONLY = ['input_31.txt']
+INPUTS = sorted(glob.glob(os.path.join(HERE, 'testCases', 'input_*.txt')) +
+                glob.glob(os.path.join(HERE, 'samples_v4', 'sample??.txt')))
+
+ANCESTORS = ['Ancestor(x, z) && Parent(z, y) => Ancestor(x, y)',
+             'Parent(x, y) => Ancestor(x, y)',
+             'Parent(Ann, Bob)',
+             'Parent(Bob, Cal)',
+             'Parent(Cal, Dan)',
+             'Parent(Eve, Ann)']
+PARITY = ['Odd(x) && Succ(x, y) => Even(y)',
+          'Even(x) && Succ(x, y) => Odd(y)',
+          'Even(Zero)',
+          'Succ(Zero, One)',
+          'Succ(One, Two)',
+          'Succ(Two, Three)',
+          'Succ(Three, Four)',
+          'Path(x, y) && Path(y, z) => Path(x, z)',
+          'Path(A, B)',
+          'Path(B, C)',
+          'Path(C, A)']
+
+
+def knowledge_base(lines):
+    kb = KnowledgeBase()
+    for line in lines:
+        kb.add_knowledge(Knowledge(line))
+    return kb
+
+
+def forward(kb, query):
+    if isinstance(query, str):
+        query = to_sentences(query)
+    return Materializer(kb).resolve(query)
+
+
+def backward(kb, query, tabling=False):
+    if isinstance(query, str):
+        query = to_sentences(query)
+    return InferenceResolver(kb, tabling=tabling, logger=Logger(level=LOG_OFF)).resolve(query)
+
+
+class TablingTest(unittest.TestCase):
+    def test_same_answers_as_plain_resolution(self):
+        for file in INPUTS:
+            query, kb = read_input(file)
+            self.assertEqual(backward(kb, query), backward(kb, query, tabling=True), file)
+
+    def test_left_recursion_terminates(self):
+        kb = knowledge_base(ANCESTORS)
+        self.assertTrue(backward(kb, 'Ancestor(Eve, Dan)', tabling=True))
+        self.assertTrue(backward(kb, 'Ancestor(Ann, Cal)', tabling=True))
+        self.assertFalse(backward(kb, 'Ancestor(Dan, Ann)', tabling=True))
+
+    def test_mutual_recursion(self):
+        kb = knowledge_base(PARITY)
+        self.assertTrue(backward(kb, 'Odd(Three) && Even(Four) && Path(A, C)', tabling=True))
+        self.assertTrue(backward(kb, 'Path(C, C)', tabling=True))
+        self.assertFalse(backward(kb, 'Even(Three)', tabling=True))
+
+    def test_tables_reset_when_knowledge_is_added(self):
+        kb = knowledge_base(ANCESTORS)
+        resolver = InferenceResolver(kb, tabling=True, logger=Logger(level=LOG_OFF))
+        self.assertFalse(resolver.resolve(to_sentences('Ancestor(Dan, Eve)')))
+        kb.add_knowledge(Knowledge('Parent(Dan, Eve)'))
+        self.assertTrue(resolver.resolve(to_sentences('Ancestor(Dan, Eve)')))
+
+
+class ForwardChainingTest(unittest.TestCase):
+    def test_same_answers_as_backward_chaining(self):
+        for file in INPUTS:
+            if os.path.basename(file) in POSITIONAL_ONLY:
+                continue
+            query, kb = read_input(file)
+            self.assertEqual(backward(kb, query), forward(kb, query), file)
+
+    def test_recursive_knowledge_bases(self):
+        kb = knowledge_base(ANCESTORS)
+        self.assertTrue(forward(kb, 'Ancestor(Eve, Dan)'))
+        self.assertFalse(forward(kb, 'Ancestor(Dan, Ann)'))
+        kb = knowledge_base(PARITY)
+        self.assertTrue(forward(kb, 'Odd(Three) && Even(Four) && Path(A, C)'))
+        self.assertFalse(forward(kb, 'Even(Three)'))
+
+    def test_variable_facts_hold_for_every_constant(self):
+        self.assertTrue(forward(knowledge_base(['E(x)']), 'E(A)'))
+        self.assertTrue(forward(knowledge_base(['E(x)', 'E(A) => F(A)']), 'F(A)'))
+
+    def test_conclusion_only_variables_stay_consistent(self):
+        kb = knowledge_base(['P1(A, B)', 'P1(A, y) => P2(z, z)'])
+        self.assertTrue(forward(kb, 'P2(C, C)'))
+        self.assertFalse(forward(kb, 'P2(A, C)'))
+
+    def test_incremental_knowledge(self):
+        kb = knowledge_base(ANCESTORS)
+        materializer = Materializer(kb)
+        self.assertFalse(materializer.resolve(to_sentences('Ancestor(Dan, Eve)')))
+        kb.add_knowledge(Knowledge('Parent(Dan, Eve)'))
+        self.assertTrue(materializer.resolve(to_sentences('Ancestor(Dan, Eve)')))
+
+
+class QueryServerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def serve(self, server, lines):
+        writer = StringIO()
+        server.serve(StringIO(''.join(line + '\n' for line in lines)), writer)
+        return writer.getvalue().splitlines()
+
+    def test_tell_and_ask(self):
+        for tabling, forward in ((False, False), (True, False), (False, True)):
+            server = QueryServer(knowledge_base(ANCESTORS[1:]), tabling, forward)
+            self.assertEqual(self.serve(server, ['ask Ancestor(Eve, Bob)', 'tell Parent(Dan, Eve)',
+                                                 'Ancestor(Dan, Eve)', '', 'ask Ancestor(Bob, Ann)']),
+                             ['False', 'ok', 'True', 'False'])
+
+    def test_failed_query_leaves_resolver_usable(self):
+        for tabling in (False, True):
+            kb = knowledge_base(['S(x, y) => T(x)', 'S(A)', 'R(A)'])
+            server = QueryServer(kb, tabling, proof_dir=self.directory)
+            responses = self.serve(server, ['T(A)', 'R(A)', 'R(B)'])
+            self.assertTrue(responses[0].startswith('error: '))
+            self.assertEqual(responses[1:], ['True', 'False'])
+            self.assertEqual(server.engine.stack, [])
+            self.assertEqual(server.engine.incomplete, [])
+            for table in (server.engine.tables or {}).values():
+                self.assertTrue(table.complete and not table.evaluating)
+            with open(os.path.join(self.directory, 'query-1.txt'), 'r') as f:
+                self.assertEqual(f.read().splitlines()[-1], 'error')
+            with open(os.path.join(self.directory, 'query-2.txt'), 'r') as f:
+                self.assertEqual(f.read().splitlines()[-1], 'True')
+
+    def test_socket_replaces_stale_path(self):
+        path = os.path.join(self.directory, 'kb.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        thread = threading.Thread(target=serve_socket, args=(QueryServer(knowledge_base(ANCESTORS[1:])), path))
+        thread.daemon = True
+        thread.start()
+        deadline = time.time() + 5
+        while True:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                client.connect(path)
+                break
+            except socket.error:
+                client.close()
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.01)
+        reader = client.makefile('r')
+        client.sendall('Ancestor(Eve, Ann)\n')
+        self.assertEqual(reader.readline(), 'True\n')
+        reader.close()
+        client.close()
+
+
+class CompiledKnowledgeBaseTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file = os.path.join(self.directory, 'kb.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_same_knowledge_base(self, kb, loaded):
+        self.assertEqual(map(str, kb.knowledges), map(str, loaded.knowledges))
+        self.assertEqual(map(symbols.name, kb.constants), map(symbols.name, loaded.constants))
+        for query in ['Ancestor(Eve, Dan)', 'Ancestor(x, Dan)', 'Parent(Bob, Cal)', 'Parent(Dan, x)']:
+            sentence = to_sentences(query)[0]
+            self.assertEqual(map(str, kb.fetch_rules(sentence)), map(str, loaded.fetch_rules(sentence)))
+
+    def test_round_trip(self):
+        kb = knowledge_base(ANCESTORS)
+        compile_kb(kb, self.file)
+        loaded = load_kb(self.file)
+        self.assertEqual(kb.by_predicate, loaded.by_predicate)
+        self.assertEqual(kb.by_constant, loaded.by_constant)
+        self.assertEqual(kb.by_variable, loaded.by_variable)
+        self.assert_same_knowledge_base(kb, loaded)
+        self.assertTrue(backward(loaded, 'Ancestor(Eve, Dan)', tabling=True))
+        self.assertTrue(forward(loaded, 'Ancestor(Eve, Dan)'))
+
+    def test_round_trip_into_a_different_symbol_table(self):
+        kb = knowledge_base(ANCESTORS)
+        compile_kb(kb, self.file)
+        symbols.intern('Compiled%d' % len(symbols.names))
+        loaded = load_kb(self.file)
+        self.assert_same_knowledge_base(kb, loaded)
+        self.assertTrue(backward(loaded, 'Ancestor(Eve, Dan)', tabling=True))
+
+    def test_same_answers_as_text_inputs(self):
+        for file in INPUTS:
+            query, kb = read_input(file)
+            compile_kb(kb, self.file)
+            loaded = load_kb(self.file)
+            self.assertEqual(backward(kb, query), backward(loaded, query), file)
+
+    def test_added_knowledge_after_loading(self):
+        compile_kb(knowledge_base(ANCESTORS), self.file)
+        loaded = load_kb(self.file)
+        loaded.add_knowledge(Knowledge('Parent(Dan, Fay)'))
+        self.assertTrue(backward(loaded, 'Ancestor(Eve, Fay)', tabling=True))
+        self.assertTrue(forward(loaded, 'Ancestor(Eve, Fay)'))
+
+    def test_rejects_other_files(self):
+        with open(self.file, 'wb') as f:
+            marshal.dump(('other', 1), f)
+        self.assertRaises(ValueError, load_kb, self.file)
+
+
+class LoggerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def prove(self, file, level, buffer_lines):
+        query, kb = read_input(file)
+        output = os.path.join(self.directory, 'output.txt')
+        logger = Logger(output, level, echo=False, buffer_lines=buffer_lines)
+        resolver = InferenceResolver(kb, logger=logger)
+        flushed = []
+        flush = logger.flush
+
+        def counted_flush():
+            flushed.append(len(logger.buffer))
+            flush()
+
+        logger.flush = counted_flush
+        answer = resolver.resolve(query)
+        logger.close(str(answer))
+        with open(output, 'r') as f:
+            return logger, f.read(), flushed
+
+    def test_full_level_is_the_same_across_flushes(self):
+        for file in INPUTS:
+            query, kb = read_input(file)
+            memory = Logger(echo=False)
+            answer = InferenceResolver(kb, logger=memory).resolve(query)
+            expected = ''.join(line + '\n' for line in memory.output) + str(answer)
+            for buffer_lines in (1, 3, 4096):
+                logger, output, flushed = self.prove(file, LOG_FULL, buffer_lines)
+                self.assertEqual(output, expected, file)
+                if buffer_lines == 3 and len(memory.output) >= 3:
+                    self.assertEqual(flushed[0], 3, file)
+
+    def test_summary_and_off_write_only_the_answer(self):
+        file = os.path.join(HERE, 'testCases', 'input_1.txt')
+        full, output, flushed = self.prove(file, LOG_FULL, 4096)
+        asked = len([line for line in output.splitlines() if line.startswith('Ask: ')])
+        answer = output.splitlines()[-1]
+        summary, output, flushed = self.prove(file, LOG_SUMMARY, 1)
+        self.assertEqual(output, answer)
+        self.assertEqual(summary.counts, full.counts)
+        self.assertEqual(summary.summary().split(',')[0], '%d asked' % asked)
+        off, output, flushed = self.prove(file, LOG_OFF, 1)
+        self.assertEqual(output, answer)
+        self.assertEqual(off.counts, {})
+
+    def test_repeated_lines_are_logged_once(self):
+        logger = Logger(echo=False)
+        sentence = to_sentences('Parent(Ann, Bob)')[0]
+        for prefix in ('Ask', 'Ask', 'True', 'Ask'):
+            logger.log(sentence, prefix)
+        self.assertEqual(logger.output, ['Ask: Parent(Ann, Bob)', 'True: Parent(Ann, Bob)', 'Ask: Parent(Ann, Bob)'])
+
+
+class CommandLineTest(unittest.TestCase):
+    def test_failed_proof_still_writes_its_log(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file = os.path.join(directory, 'input.txt')
+            with open(file, 'w') as f:
+                f.write('T(A)\n3\nR(A) => T(A)\nS(x, y) => T(x)\nS(A)\n')
+            process = subprocess.Popen([sys.executable, SCRIPT, '-i', file, '--quiet'], stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, cwd=directory)
+            out, err = process.communicate()
+            self.assertEqual(process.returncode, 1)
+            with open(os.path.join(directory, 'output.txt'), 'r') as f:
+                self.assertEqual(f.read().splitlines(), ['Ask: T(A)', 'Ask: R(A)', 'False: R(A)', 'Ask: T(A)', 'error'])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_flag_without_value_is_a_usage_error(self):
+        process = subprocess.Popen([sys.executable, SCRIPT, '-i', INPUTS[0], '--kb'], stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        out, err = process.communicate()
+        self.assertEqual(process.returncode, 2)
+        self.assertTrue('expected one argument' in err)
+
+
+if __name__ == '__main__':
+    unittest.main()